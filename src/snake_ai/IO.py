@@ -4,13 +4,30 @@
 # Date: 22/06/2023
 # Version: 0.0.1
 
-from typing import Type, Any
+from typing import Type, Any, Callable, BinaryIO
+import numpy as np
+import threading
 import hashlib
 import pickle
+import struct
+import json
 import os
 
 
 class IO:
+    # Object files: magic, format version and number of out-of-band buffers, the pickle stream and every buffer as
+    # length prefixed frames and the SHA-256 digest of the frames
+    OBJECT_MAGIC = b'SNAKEOBJ'
+    OBJECT_VERSION = 1
+    _FRAME = struct.Struct('<Q')
+    # Binary population container: magic, format version and header length, the JSON header padded to a multiple of
+    # the alignment, the (individuals, length) codification block and the SHA-256 digest of the block
+    POPULATION_MAGIC = b'SNAKEPOP'
+    POPULATION_VERSION = 1
+    _PREFIX = struct.Struct('<8sII')
+    _ALIGNMENT = 64
+    _DIGEST_SIZE = 32
+
     @staticmethod
     def _calculate_checksum(data: bytes):
         """
@@ -22,39 +39,231 @@ class IO:
     @staticmethod
     def save(path: str, name: str, obj: object) -> int:
         """
-        Saves an object instance as a binary file
+        Saves an object instance as a binary file. The object is pickled with out-of-band buffers, so the data of the
+        arrays is written straight from their memory, and it is hashed while it is written. The file is written under a
+        temporary name and renamed when it is complete, so a crash never leaves a partially written file
         :param path: path where to save the object
         :param name: output file name
         :param obj: object instance to be saved
         :return:
         """
+        buffers: list[pickle.PickleBuffer] = []
+        data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+
+        def write(file: BinaryIO) -> None:
+            file.write(IO._PREFIX.pack(IO.OBJECT_MAGIC, IO.OBJECT_VERSION, len(buffers)))
+            digest = hashlib.sha256()
+            for frame in [memoryview(data)] + [buffer.raw() for buffer in buffers]:
+                length = IO._FRAME.pack(frame.nbytes)
+                digest.update(length)
+                digest.update(frame)
+                file.write(length)
+                file.write(frame)
+            file.write(digest.digest())
+
+        IO.write_atomic(path, name, write)
+        return 0
+
+    @staticmethod
+    def write_atomic(path: str, name: str, write: Callable[[BinaryIO], None]) -> None:
+        """
+        Writes a file under a temporary name and renames it when it is complete, so a crash never leaves a partially
+        written file
+        :param path: path where to write the file
+        :param name: file name
+        :param write: function that writes the content to the open file
+        :return:
+        """
+        # The temporary name is unique for every writer thread
+        temporary = os.path.join(path, f'.{name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(temporary, 'wb') as file:
+                write(file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, os.path.join(path, name))
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
 
-        with open(os.path.join(path, name), 'wb') as file:
-            data = pickle.dumps(obj)
-            checksum = IO._calculate_checksum(data)
-            pickle.dump((checksum, data), file)
+    @staticmethod
+    def save_population(path: str, name: str, population: dict, dtype: type = np.float64) -> int:
+        """
+        Saves a population as a binary container, the settings go to a small header and the codifications to one
+        contiguous block that can be memory mapped. The file is replaced atomically as in IO.save
+        :param path: path where to save the population
+        :param name: output file name
+        :param population: settings of the population, see Population, with the codification of each individual by
+        id under the 'population' key. The ids must go from 1 to the number of individuals
+        :param dtype: type of the codification values in the file, float64 or float32
+        :return:
+        """
+        dtype = np.dtype(dtype).newbyteorder('<')
+        if dtype.kind != 'f' or dtype.itemsize not in (4, 8):
+            raise ValueError(f"Population codifications must be stored as float32 or float64. Found: {dtype}")
+        genomes = population['population']
+        if sorted(genomes.keys()) != list(range(1, len(genomes) + 1)):
+            raise ValueError('Population ids must go from 1 to the number of individuals')
+        length = len(genomes[1]) if genomes else 0
+        header = {name: value for name, value in population.items() if name != 'population'}
+        header |= {'individuals': len(genomes), 'length': length, 'dtype': dtype.str}
+        encoded = json.dumps(header).encode('utf-8')
+        offset = -(-(IO._PREFIX.size + len(encoded)) // IO._ALIGNMENT) * IO._ALIGNMENT
+
+        def write(file: BinaryIO) -> None:
+            file.write(IO._PREFIX.pack(IO.POPULATION_MAGIC, IO.POPULATION_VERSION, len(encoded)))
+            file.write(encoded.ljust(offset - IO._PREFIX.size, b' '))
+            digest = hashlib.sha256()
+            # The rows are written one by one, the block is never gathered in memory
+            for id in range(1, len(genomes) + 1):
+                row = np.ascontiguousarray(genomes[id], dtype=dtype)
+                if row.shape != (length,):
+                    raise ValueError(f"Every codification must have length {length}. Found: {row.shape} for id {id}")
+                digest.update(row)
+                file.write(row)
+            file.write(digest.digest())
+
+        IO.write_atomic(path, name, write)
         return 0
 
+    @staticmethod
+    def load_population_header(file_path: str) -> dict | int:
+        """
+        Reads the header of a binary population container without reading the codifications
+        :param file_path: absolute file path
+        :return: population settings plus the 'individuals', 'length', 'dtype', 'offset', 'version' and 'digest'
+        entries, the digest is the hex sha256 of the codifications block. -1 if the file size does not match the
+        header, -2 if the file is not a supported population container
+        """
+        path = os.path.normpath(file_path)
+        try:
+            with open(path, 'rb') as file:
+                magic, version, size = IO._PREFIX.unpack(file.read(IO._PREFIX.size))
+                if magic != IO.POPULATION_MAGIC or version != IO.POPULATION_VERSION:
+                    return -2
+                header = json.loads(file.read(size).decode('utf-8'))
+        except Exception:
+            return -2
+        header['offset'] = -(-(IO._PREFIX.size + size) // IO._ALIGNMENT) * IO._ALIGNMENT
+        header['version'] = version
+        block = header['individuals'] * header['length'] * np.dtype(header['dtype']).itemsize
+        # A truncated or extended file can not be mapped
+        if os.path.getsize(path) != header['offset'] + block + IO._DIGEST_SIZE:
+            return -1
+        with open(path, 'rb') as file:
+            file.seek(header['offset'] + block)
+            header['digest'] = file.read(IO._DIGEST_SIZE).hex()
+        return header
+
+    @staticmethod
+    def load_population(file_path: str, verify: bool = False, writable: bool = False,
+                        mapped: bool = True) -> dict | int:
+        """
+        Loads a population. The codifications of a binary container are memory mapped, the individuals are read-only
+        views of the file rows, so nothing is read until they are used. The files saved by IO.save are loaded as before
+        :param file_path: absolute file path
+        :param verify: checks the digest of the codifications, which reads the whole block
+        :param writable: maps the codifications copy-on-write, the rows can be modified and just the modified pages
+        are copied in memory, the file is never changed
+        :param mapped: False reads the codifications into memory instead of mapping them. A mapped file can not be
+        replaced on Windows, so the populations that are trained further, whose file is saved again, are not mapped
+        :return: population settings with the codification of each individual by id under the 'population' key, -1
+        if the file is corrupted, -2 if it is not a population file and -3 if it does not contain a population
+        """
+        header = IO.load_population_header(file_path)
+        if header == -2:
+            with open(os.path.normpath(file_path), 'rb') as file:
+                binary = file.read(len(IO.POPULATION_MAGIC)) == IO.POPULATION_MAGIC
+            # Files saved by IO.save
+            return -2 if binary else IO.load(file_path, dict)
+        if not isinstance(header, dict):
+            return header
+        path = os.path.normpath(file_path)
+        shape = (header['individuals'], header['length'])
+        if shape[0] == 0 or shape[1] == 0:
+            matrix = np.zeros(shape, dtype=header['dtype'])
+        elif not mapped:
+            matrix = np.fromfile(path, dtype=header['dtype'], count=shape[0] * shape[1],
+                                 offset=header['offset']).reshape(shape)
+        else:
+            # Plain array views of the mapping, the memmap subclass makes the row access slow
+            matrix = np.asarray(np.memmap(path, dtype=header['dtype'], mode='c' if writable else 'r',
+                                          offset=header['offset'], shape=shape))
+        if verify:
+            with open(path, 'rb') as file:
+                file.seek(header['offset'] + matrix.nbytes)
+                if hashlib.sha256(matrix).digest() != file.read(IO._DIGEST_SIZE):
+                    return -1
+        population = {name: value for name, value in header.items()
+                      if name not in ('individuals', 'length', 'dtype', 'offset', 'version', 'digest')}
+        population['population'] = {row + 1: genome for row, genome in enumerate(matrix)}
+        return population
+
     @staticmethod
     def load(file_path: str, obj_class: Type) -> Any | None:
         """
-        Loads and object
+        Loads and object, the frames are hashed while they are read and the object is not unpickled unless the digest
+        matches. The arrays of the object use the memory the frames are read into
         :param file_path: absolute file path
         :param obj_class: type of the object to be load
-        :return: object instance
+        :return: object instance, -1 if the file is corrupted, -2 if it can not be read and -3 if the object is not
+        an instance of the class
         """
         path = os.path.normpath(file_path)
         with open(path, 'rb') as file:
+            prefix = file.read(IO._PREFIX.size)
+            if len(prefix) < IO._PREFIX.size or not prefix.startswith(IO.OBJECT_MAGIC):
+                # Files saved before the framed format
+                file.seek(0)
+                return IO._load_pickled(file, obj_class)
             try:
-                checksum, obj = pickle.load(file)
-                recalculated_checksum = IO._calculate_checksum(obj)
-                # If the files is corrupted
-                if checksum != recalculated_checksum:
+                _, version, count = IO._PREFIX.unpack(prefix)
+                if version != IO.OBJECT_VERSION:
+                    return -2
+                remaining = os.fstat(file.fileno()).st_size - IO._PREFIX.size
+                digest = hashlib.sha256()
+                frames = []
+                for _ in range(count + 1):
+                    header = file.read(IO._FRAME.size)
+                    (length,) = IO._FRAME.unpack(header)
+                    remaining -= IO._FRAME.size + length
+                    # A truncated file or a damaged length
+                    if remaining < IO._DIGEST_SIZE:
+                        return -2
+                    frame = bytearray(length)
+                    file.readinto(frame)
+                    digest.update(header)
+                    digest.update(frame)
+                    frames.append(frame)
+                if digest.digest() != file.read(IO._DIGEST_SIZE):
                     return -1
+                obj = pickle.loads(frames[0], buffers=frames[1:])
             except Exception:
                 return -2
-            obj = pickle.loads(obj)
-            if isinstance(obj, obj_class):
-                return obj
-            else:
-                return -3
+        if isinstance(obj, obj_class):
+            return obj
+        else:
+            return -3
+
+    @staticmethod
+    def _load_pickled(file: BinaryIO, obj_class: Type) -> Any | None:
+        """
+        Loads an object saved as a pickled checksum and pickled object tuple
+        :param file: open file
+        :param obj_class: type of the object to be load
+        :return: object instance or error code as in IO.load
+        """
+        try:
+            checksum, obj = pickle.load(file)
+            recalculated_checksum = IO._calculate_checksum(obj)
+            # If the files is corrupted
+            if checksum != recalculated_checksum:
+                return -1
+        except Exception:
+            return -2
+        obj = pickle.loads(obj)
+        if isinstance(obj, obj_class):
+            return obj
+        else:
+            return -3
@@ -6,6 +6,7 @@
 
 
 from dataclasses import dataclass
+import numpy as np
 import os
 
 
@@ -34,3 +35,39 @@ class Folders:
     statistics_folder = os.path.join(data_folder, 'statistics')
     models_folder = os.path.join(data_folder, 'models')
     populations_folder = os.path.join(data_folder, 'populations')
+
+
+@dataclass
+class StatsTable:
+    """
+    Columnar layout of the game stats of a population, a structured array with one row per individual and one field
+    per entry of StatsStruct.get_stats plus the individual id and the number of episodes played. When an individual
+    plays several episodes its stats are the average over them, so the game counters are stored as floats
+    """
+    stats = ('max_score', 'score', 'moves', 'turns', 'accuracy', 'efficiency', 'lmoves', 'rmoves', 'smoves')
+    dtype = np.dtype([('id', np.int64), ('episodes', np.int64), ('max_score', np.int64), ('score', np.float64),
+                      ('moves', np.float64), ('turns', np.float64), ('accuracy', np.float64),
+                      ('efficiency', np.float64), ('lmoves', np.float64), ('rmoves', np.float64),
+                      ('smoves', np.float64)])
+
+    @staticmethod
+    def from_results(results: list[tuple[int, dict[str, float]]]) -> np.ndarray:
+        """
+        Produces the columnar form of a list of stats of one episode
+        :param results: list with the id of each individual and a dict containing its performance stats
+        :return: structured array
+        """
+        table = np.zeros(len(results), dtype=StatsTable.dtype)
+        for i, (id, stats) in enumerate(results):
+            table[i] = (id, 1, *(stats[name] for name in StatsTable.stats))
+        return table
+
+    @staticmethod
+    def to_results(table: np.ndarray) -> list[tuple[int, dict[str, float]]]:
+        """
+        Produces the list of stats of a columnar table
+        :param table: structured array
+        :return: list with the id of each individual and a dict containing its performance stats
+        """
+        columns = table[['id', *StatsTable.stats]].tolist()
+        return [(row[0], dict(zip(StatsTable.stats, row[1:]))) for row in columns]
@@ -0,0 +1,187 @@
+# This module contains the evolution strategies that can optimize a population instead of the genetic algorithm
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.genetic.optimizer_abc import Optimizer
+from abc import abstractmethod
+import numpy as np
+
+
+class EvolutionStrategy(Optimizer):
+    """
+    Base of the optimizers that consider the population as samples of a search distribution over the codifications.
+    Every generation the distribution is updated from the ranking of the samples and the whole population is sampled
+    again as one matrix, except the best individual that is kept so it can be saved and compared. The first
+    population, the one created by the NN initialization, sets the initial mean of the distribution
+    """
+    def __init__(self, fitness: str, sigma: float | None = None, seed: int | None = None):
+        """
+        Constructor
+        :param fitness: fitness function name, see GAFunctionFactory
+        :param sigma: initial step size, the average standard deviation of the first population genes if None
+        :param seed: seed of the random stream of the optimizer, the process is reproducible with it
+        """
+        super().__init__(fitness=fitness, seed=seed)
+        self._sigma = sigma
+        self._mean: np.ndarray | None = None
+        self._generation = 0
+        # Row of the individual kept from the previous generation, it is not a sample of the distribution
+        self._elite: int | None = None
+
+    @property
+    def mean(self) -> np.ndarray | None:
+        """
+        Mean of the search distribution
+        :return:
+        """
+        return self._mean
+
+    @property
+    def sigma(self) -> float | None:
+        return self._sigma
+
+    @property
+    def parameters(self) -> dict:
+        return {} if self._sigma is None else {'sigma': float(self._sigma)}
+
+    def next_gen(self, population: dict[int, np.ndarray] | np.ndarray, scores: np.ndarray) -> tuple[int, np.ndarray]:
+        """
+        Updates the search distribution and samples the next generation, it is written directly into the population
+        :param population: codification of each individual by id, or a (individuals, length) matrix where the
+        individual with id i is the row i - 1, as a GenomeMatrix array. The arrays are overwritten
+        :param scores: structured array with the performance stats of each individual, see StatsTable. The ids go
+        from 1 to the number of individuals
+        :return: id of the best individual and the fitness of the population, the fitness of the individual with id i
+        is the position i - 1
+        """
+        if isinstance(population, np.ndarray):
+            matrix = population
+        else:
+            matrix = np.stack([population[id] for id in range(1, len(population) + 1)])
+        population_fitness = self.population_fitness(scores)
+        if self._mean is None:
+            self._initialize(matrix)
+        # Samples ranked from the best to the worst
+        ranking = np.argsort(-population_fitness, kind='stable')
+        self._update(matrix, ranking[ranking != self._elite])
+        self._generation += 1
+        best = int(ranking[0])
+        elite = matrix[best].copy()
+        self._sample(matrix)
+        matrix[best] = elite
+        self._elite = best
+        if not isinstance(population, np.ndarray):
+            for row, genome in enumerate(matrix):
+                population[row + 1][:] = genome
+        return best + 1, population_fitness
+
+    def _initialize(self, population: np.ndarray) -> None:
+        """
+        Sets the initial state of the search distribution from the first population
+        :param population: (individuals, length) codification matrix
+        :return:
+        """
+        self._mean = population.mean(axis=0)
+        if self._sigma is None:
+            self._sigma = float(population.std(axis=0).mean()) or 1.0
+
+    @abstractmethod
+    def _update(self, population: np.ndarray, ranking: np.ndarray) -> None:
+        """
+        This method must update the search distribution from the samples
+        :param population: (individuals, length) codification matrix with the evaluated samples
+        :param ranking: rows of the samples ordered from the best to the worst
+        :return:
+        """
+
+    @abstractmethod
+    def _sample(self, population: np.ndarray) -> None:
+        """
+        This method must write new samples of the search distribution into the population
+        :param population: (individuals, length) codification matrix
+        :return:
+        """
+
+
+class SepCMAES(EvolutionStrategy):
+    """
+    Separable CMA-ES, the covariance matrix is restricted to its diagonal so the update and the sampling are linear in
+    the codification length, which makes it practical for the size of the NN codifications
+    """
+    def _initialize(self, population: np.ndarray) -> None:
+        super()._initialize(population)
+        individuals, n = population.shape
+        mu = max(1, (individuals - 1) // 2)
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        self._weights = weights / weights.sum()
+        self._mueff = 1 / np.sum(self._weights ** 2)
+        # Learning rates, the ones of the covariance are scaled up as it just learns the diagonal
+        self._cs = (self._mueff + 2) / (n + self._mueff + 5)
+        self._ds = 1 + 2 * max(0.0, np.sqrt((self._mueff - 1) / (n + 1)) - 1) + self._cs
+        self._cc = (4 + self._mueff / n) / (n + 4 + 2 * self._mueff / n)
+        self._c1 = 2 / ((n + 1.3) ** 2 + self._mueff) * (n + 2) / 3
+        self._cmu = min(1 - self._c1, 2 * (self._mueff - 2 + 1 / self._mueff) / ((n + 2) ** 2 + self._mueff)
+                        * (n + 2) / 3)
+        self._chi = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+        self._variances = np.ones(n)
+        self._ps = np.zeros(n)
+        self._pc = np.zeros(n)
+
+    def _update(self, population: np.ndarray, ranking: np.ndarray) -> None:
+        n = population.shape[1]
+        weights = self._weights[:len(ranking)]
+        weights = weights / weights.sum()
+        steps = (population[ranking[:len(weights)]] - self._mean) / self._sigma
+        step = weights @ steps
+        self._mean = self._mean + self._sigma * step
+        # Evolution paths
+        self._ps = ((1 - self._cs) * self._ps +
+                    np.sqrt(self._cs * (2 - self._cs) * self._mueff) * step / np.sqrt(self._variances))
+        norm = np.linalg.norm(self._ps)
+        hsig = norm / np.sqrt(1 - (1 - self._cs) ** (2 * (self._generation + 1))) / self._chi < 1.4 + 2 / (n + 1)
+        self._pc = (1 - self._cc) * self._pc + hsig * np.sqrt(self._cc * (2 - self._cc) * self._mueff) * step
+        # Rank one and rank mu updates of the diagonal covariance
+        self._variances = ((1 - self._c1 - self._cmu) * self._variances +
+                           self._c1 * (self._pc ** 2 + (1 - hsig) * self._cc * (2 - self._cc) * self._variances) +
+                           self._cmu * (weights @ steps ** 2))
+        self._sigma *= float(np.exp(self._cs / self._ds * (norm / self._chi - 1)))
+
+    def _sample(self, population: np.ndarray) -> None:
+        self._rng.standard_normal(out=population)
+        population *= self._sigma * np.sqrt(self._variances)
+        population += self._mean
+
+
+class OpenAIES(EvolutionStrategy):
+    """
+    OpenAI evolution strategy, the mean follows a gradient estimate built from the centered ranks of antithetic
+    samples of an isotropic gaussian with fixed step size
+    """
+    def __init__(self, fitness: str, learning_rate: float = 0.01, sigma: float | None = None,
+                 seed: int | None = None):
+        """
+        Constructor
+        :param fitness: fitness function name, see GAFunctionFactory
+        :param learning_rate: step of the mean along the gradient estimate
+        :param sigma: standard deviation of the samples, the average standard deviation of the first population genes
+        if None
+        :param seed: seed of the random stream of the optimizer, the process is reproducible with it
+        """
+        super().__init__(fitness=fitness, sigma=sigma, seed=seed)
+        self._learning_rate = learning_rate
+
+    def _update(self, population: np.ndarray, ranking: np.ndarray) -> None:
+        # Centered ranks from 0.5 for the best sample to -0.5 for the worst one
+        utilities = 0.5 - np.arange(len(ranking)) / max(1, len(ranking) - 1)
+        noise = (population[ranking] - self._mean) / self._sigma
+        gradient = utilities @ noise / (len(ranking) * self._sigma)
+        self._mean = self._mean + self._learning_rate * gradient
+
+    def _sample(self, population: np.ndarray) -> None:
+        # Every noise vector is used with both signs
+        half = (len(population) + 1) // 2
+        noise = self._rng.standard_normal((half, population.shape[1])) * self._sigma
+        population[:half] = self._mean + noise
+        population[half:] = self._mean - noise[:len(population) - half]
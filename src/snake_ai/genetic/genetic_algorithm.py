@@ -5,69 +5,194 @@
 # Date: 29/05/2023
 # Version: 0.0.1
 
-from snake_ai.genetic.genetic_functions import GAFunctionFactory
+from snake_ai.genetic.optimizer_abc import Optimizer
+from snake_ai.genetic.schedule_factory import ScheduleFactory
 import numpy as np
-import random
 
 
-class GA:
+class GA(Optimizer):
     """
     Class intended to perform the genetic process
     """
     def __init__(self, selection: str, fitness: str, crossover: str, crossover_rate: float, mutation: str,
                  mutation_rate: float, offspring: int, crossover_params: dict, mutations_params: dict,
-                 selection_params: dict):
-        self._factory = GAFunctionFactory()
+                 selection_params: dict, seed: int | None = None, elitism: int = 0, schedule: str = 'constant',
+                 schedule_params: dict | None = None):
+        if elitism < 0:
+            raise ValueError(f"Elitism must be a non negative number of individuals. Found: {elitism}")
+        super().__init__(fitness=fitness, seed=seed)
         self._selection = self._factory.get_function('selection', selection)
-        self._fitness = self._factory.get_function('fitness', fitness)
-        self._crossover = self._factory.get_function('crossover', crossover)
-        self._mutation = self._factory.get_function('mutation', mutation)
-        self._mutation_rate = mutation_rate
+        # The whole offspring is produced at once
+        self._crossover = self._factory.get_function('batchcrossover', crossover)
+        self._mutation = self._factory.get_function('batchmutation', mutation)
         self._crossover_rate = crossover_rate
         self._offspring = offspring
+        # Number of best individuals that are never replaced
+        self._elitism = elitism
         self._crossover_params = crossover_params
         self._mutation_params = mutations_params
         self._selection_params = selection_params
+        self._replaced = np.zeros(0, dtype=np.int64)
+        # The schedule sets the mutation rate and sigma of every generation
+        self._schedule = ScheduleFactory().get_instance(schedule, mutation_rate=mutation_rate,
+                                                        sigma=mutations_params.get('sigma'),
+                                                        **(schedule_params or {}))
+        self._generations = 0.0
+        # Mean fitness of the parents of the children not evaluated yet, NaN for the rest of the individuals
+        self._parents_fitness = np.zeros(0)
+        self._success: float | None = None
+
+    @property
+    def replaced(self) -> np.ndarray:
+        """
+        Ids of the individuals replaced by children in the last generation
+        :return:
+        """
+        return self._replaced
+
+    @property
+    def parameters(self) -> dict:
+        parameters = self._schedule.values
+        if self._success is not None:
+            parameters['success'] = self._success
+        return parameters
 
     @staticmethod
-    def coupling(parents: list[int]):
+    def coupling(parents: np.ndarray, rng: np.random.Generator | None = None) -> np.ndarray:
         if len(parents) % 2 != 0:
             raise ValueError('Pairing just support a even number of parents')
-        population = list(parents)
-        couples = []
-        for _ in range(len(parents) // 2):
-            p1 = random.randint(0, len(population) - 1)
-            p1 = population.pop(p1)
-            p2 = random.randint(0, len(population) - 1)
-            p2 = population.pop(p2)
-            couples.append((p1, p2))
-        return couples
+        rng = np.random.default_rng() if rng is None else rng
+        # Consecutive positions of a random permutation are paired
+        return rng.permutation(parents).reshape(-1, 2)
 
-    def next_gen(self, population: dict[int, np.ndarray], scores: list[tuple[int, dict[str, float]]]):
-        # Calculate population fitness
-        population_fitness = self._fitness(scores)
+    @staticmethod
+    def _worst(fitness: np.ndarray, count: int, elitism: int) -> np.ndarray:
+        """
+        Finds the worst individuals without sorting the whole population
+        :param fitness: fitness of each individual
+        :param count: number of individuals wanted
+        :param elitism: number of best individuals that can not be part of them
+        :return: indices of the worst individuals in no particular order
+        """
+        count = max(0, min(count, len(fitness) - elitism))
+        if count == 0:
+            return np.zeros(0, dtype=np.int64)
+        if count == len(fitness):
+            return np.arange(len(fitness))
+        return np.argpartition(fitness, count - 1)[:count]
+
+    def _breed(self, population: dict[int, np.ndarray] | np.ndarray, population_fitness: np.ndarray,
+               offspring: int, candidates: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Produces children from parents selected by their fitness
+        :param population: codification of each individual by id, or a (individuals, length) matrix where the
+        individual with id i is the row i - 1
+        :param population_fitness: fitness of each individual, the individual with id i is the position i - 1
+        :param offspring: number of children, it is rounded up to an even number
+        :param candidates: ascending ids of the individuals that can be parents, all of them if None
+        :return: (offspring, length) array, consecutive rows are siblings, and the ids of the parents of each couple of
+        siblings
+        """
         # Select parents and form couples
-        if self._offspring % 2 != 0:
-            offspring = self._offspring + 1
-        else:
-            offspring = self._offspring
-        parents = self._selection(num_parents=offspring, population_fitness=population_fitness,
+        if offspring % 2 != 0:
+            offspring = offspring + 1
+        fitness = population_fitness if candidates is None else population_fitness[candidates - 1]
+        parents = self._selection(num_parents=offspring, population_fitness=fitness, rng=self._rng,
                                   **self._selection_params)
-        couples = GA.coupling(parents)
-        parents = {key: population[key] for key in parents}
-        # Produce children
-        children = []
-        for pair in couples:
-            if random.uniform(0, 1) < self._crossover_rate:
-                children.extend(self._crossover(parents[pair[0]], parents[pair[1]], **self._crossover_params))
-            else:
-                children.append(parents[pair[0]])
-                children.append(parents[pair[1]])
+        if candidates is not None:
+            parents = candidates[parents - 1]
+        couples = GA.coupling(parents, self._rng)
+        # Parents are gathered as copies because they can be among the individuals that are going to be replaced
+        if isinstance(population, dict):
+            parents1 = np.stack([population[id] for id in couples[:, 0]])
+            parents2 = np.stack([population[id] for id in couples[:, 1]])
+        else:
+            parents1 = population[couples[:, 0] - 1]
+            parents2 = population[couples[:, 1] - 1]
+        # Produce children, the couples that do not cross pass their parents
+        children = np.empty((offspring, parents1.shape[1]))
+        first, second = children[0::2], children[1::2]
+        self._crossover(parents1, parents2, out=(first, second), rng=self._rng, **self._crossover_params)
+        keep = self._rng.uniform(0, 1, len(couples)) >= self._crossover_rate
+        first[keep] = parents1[keep]
+        second[keep] = parents2[keep]
         # Mutate children
-        for i in range(len(children)):
-            children[i] = self._mutation(children[i], self._mutation_rate, **self._mutation_params)
-        # Replacement
-        sorted_population = [k for k, v in sorted(population_fitness.items(), key=lambda item: item[1])]
-        for i in range(self._offspring):
-            population[sorted_population[i]] = children[i]
-        return sorted_population[-1], population_fitness
+        self._schedule.mutate(self._mutation, children, couples, self._mutation_params, self._rng)
+        return children, couples
+
+    def _adapt(self, population_fitness: np.ndarray, evaluated: np.ndarray, generations: float) -> None:
+        """
+        Measures how many of the evaluated children improve their parents and steps the mutation schedule
+        :param population_fitness: fitness of each individual, the individual with id i is the position i - 1
+        :param evaluated: ids of the individuals whose fitness is known
+        :param generations: generations elapsed since the last step
+        :return:
+        """
+        if len(self._parents_fitness) != len(population_fitness):
+            self._parents_fitness = np.full(len(population_fitness), np.nan)
+        rows = evaluated - 1
+        rows = rows[~np.isnan(self._parents_fitness[rows])]
+        if len(rows) > 0:
+            self._success = float(np.mean(population_fitness[rows] > self._parents_fitness[rows]))
+            self._parents_fitness[rows] = np.nan
+        self._generations += generations
+        self._schedule.step(self._generations, self._success if len(rows) > 0 else None)
+
+    def _replace(self, population_fitness: np.ndarray, couples: np.ndarray, replaced: np.ndarray) -> None:
+        """
+        Keeps track of the individuals that hold children
+        :param population_fitness: fitness of each individual, the individual with id i is the position i - 1
+        :param couples: ids of the parents of each couple of siblings
+        :param replaced: ids of the individuals replaced, in the order of the children
+        :return:
+        """
+        parents_fitness = np.repeat(population_fitness[couples - 1].mean(axis=1), 2)
+        self._parents_fitness[replaced - 1] = parents_fitness[:len(replaced)]
+        self._schedule.replace(replaced)
+        self._replaced = replaced
+
+    def next_gen(self, population: dict[int, np.ndarray] | np.ndarray, scores: np.ndarray):
+        """
+        Produces the next generation, the children are written directly into the individuals they replace
+        :param population: codification of each individual by id, or a (individuals, length) matrix where the
+        individual with id i is the row i - 1, as a GenomeMatrix array. The arrays are overwritten
+        :param scores: structured array with the performance stats of each individual, see StatsTable. The ids go
+        from 1 to the number of individuals
+        :return: id of the best individual and the fitness of the population, the fitness of the individual with id i
+        is the position i - 1
+        """
+        # Calculate population fitness
+        population_fitness = self.population_fitness(scores)
+        self._adapt(population_fitness, np.arange(1, len(population_fitness) + 1), 1)
+        children, couples = self._breed(population, population_fitness, self._offspring)
+        # The worst individuals are replaced, an odd offspring discards the last child and the elite discards the
+        # children that would replace it
+        replaced = GA._worst(population_fitness, self._offspring, self._elitism) + 1
+        if isinstance(population, dict):
+            for id, child in zip(replaced.tolist(), children):
+                population[id][:] = child
+        else:
+            population[replaced - 1] = children[:len(replaced)]
+        self._replace(population_fitness, couples, replaced)
+        return int(np.argmax(population_fitness)) + 1, population_fitness
+
+    def steady_state(self, population: np.ndarray, population_fitness: np.ndarray, evaluated: np.ndarray,
+                     offspring: int) -> np.ndarray:
+        """
+        Replaces the worst evaluated individuals with children of the evaluated ones, it is meant for asynchronous
+        training where the rest of the individuals are still being evaluated
+        :param population: (individuals, length) matrix where the individual with id i is the row i - 1, as a
+        GenomeMatrix array. It is overwritten
+        :param population_fitness: fitness of each individual, the individual with id i is the position i - 1, just
+        the values of the evaluated individuals are used
+        :param evaluated: ascending ids of the individuals whose fitness is known
+        :param offspring: number of children
+        :return: ids of the replaced individuals, they hold the children now
+        """
+        # Every population size children count as a generation for the schedule
+        self._adapt(population_fitness, evaluated, offspring / len(population))
+        children, couples = self._breed(population, population_fitness, offspring, evaluated)
+        replaced = evaluated[GA._worst(population_fitness[evaluated - 1], offspring, self._elitism)]
+        population[replaced - 1] = children[:len(replaced)]
+        self._replace(population_fitness, couples, replaced)
+        return replaced
@@ -5,7 +5,6 @@
 # Version: 0.0.1
 
 from snake_ai.function_factory_abc import FunctionFactory
-import random
 import numpy as np
 
 
@@ -17,180 +16,215 @@ class GAFunctionFactory(FunctionFactory):
         super().__init__(globals(), __name__)
 
 
+def _generator(rng: np.random.Generator | None) -> np.random.Generator:
+    """
+    Produces the random stream used by a function, a new unseeded one if the caller does not provide any
+    :param rng: random generator given by the caller
+    :return:
+    """
+    return np.random.default_rng() if rng is None else rng
+
+
 class _Fitness:
     """
     This class contains different implementations of the fitness function
     """
     @staticmethod
-    def fitness1(individuals: list[tuple[int, dict[str, float]]]) -> dict[int, float]:
-        """
-        Calculates the fitness over all snake individuals
-        :param individuals: lists with individuals id's and them performance stats
-        :return results: dictionary with the individual id and its fitness value pairs
-        """
-        def function(max_score: float, score: float, efficiency: float, moves: float, lmoves: float, rmoves: float):
-            """
-            Auxiliary function that contains the mathematical logic of the fitness function
-            :param max_score: maximum possible score
-            :param score: real score
-            :param efficiency: efficiency as the average of steps taken in relation with the minimum possible path
-            :param moves: number of total moves
-            :param lmoves: number of moves taken to the left
-            :param rmoves: number of moves taken to the right
-            :return fitness:  fitness value
-            """
-            penalty = 0.5
-            if lmoves == 0 or rmoves == 0:
-                penalty = 0
-            elif (max_score * 0.1) < score <= (max_score * 0.4):
-                if min(lmoves, rmoves) / max(lmoves, rmoves) > 0.8:
-                    penalty = 0.3
-                elif min(lmoves, rmoves) / max(lmoves, rmoves) > 0.6:
-                    penalty = 0.6
-                else:
-                    penalty = 1
-            elif (max_score * 0.4) < score:
-                penalty = 1
-            fitness = (score ** 3 + (moves / 100) ** 3) * penalty
-            extra = 0
-            if score == max_score:
-                extra = (score * efficiency) ** 3
-            return fitness + extra
-
-        results: dict[int, float] = {}
-        # Calculate population's fitness
-        for individual in individuals:
-            max_score = individual[1]['max_score']
-            score = individual[1]['score']
-            effi = individual[1]['efficiency']
-            moves = individual[1]['moves']
-            lmoves = individual[1]['lmoves']
-            rmoves = individual[1]['rmoves']
-            fitness = function(max_score, score, effi, moves, lmoves, rmoves)
-            results[individual[0]] = fitness
-        return results
+    def fitness1(individuals: np.ndarray) -> np.ndarray:
+        """
+        Calculates the fitness over all snake individuals at once
+        :param individuals: structured array with the performance stats of each individual, see StatsTable
+        :return results: fitness value of each row of the stats
+        """
+        max_score = individuals['max_score'].astype(np.float64)
+        score = individuals['score'].astype(np.float64)
+        moves = individuals['moves'].astype(np.float64)
+        lmoves = individuals['lmoves'].astype(np.float64)
+        rmoves = individuals['rmoves'].astype(np.float64)
+        # Balance between left and right turns, it is only used when both are taken
+        turns = np.maximum(lmoves, rmoves)
+        balance = np.divide(np.minimum(lmoves, rmoves), turns, out=np.zeros_like(turns), where=turns != 0)
+        middle = ((max_score * 0.1) < score) & (score <= (max_score * 0.4))
+        # The first condition that holds sets the penalty
+        penalty = np.select([(lmoves == 0) | (rmoves == 0), middle & (balance > 0.8), middle & (balance > 0.6),
+                             middle, (max_score * 0.4) < score],
+                            [0, 0.3, 0.6, 1, 1], default=0.5)
+        fitness = (score ** 3 + (moves / 100) ** 3) * penalty
+        extra = np.where(score == max_score, (score * individuals['efficiency']) ** 3, 0)
+        return fitness + extra
 
 
 class _Selection:
     """
-    This class is meant to contain all the different selection techniques over a population
+    This class is meant to contain all the different selection techniques over a population.
+    The population fitness can be given as a dict by individual id or as an array where the individual with id i is
+    at index i - 1, the ids of the selected parents are returned in both cases
     """
     @staticmethod
-    def stochastic(num_parents: int, population_fitness: dict[int, float]) -> list[int]:
+    def _cumulative(population_fitness: dict[int, float] | np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Produces the arrays used by the selection techniques
+        :param population_fitness: fitness of each individual
+        :return: ids, fitness and normalized cumulative fitness of the individuals
+        """
+        if isinstance(population_fitness, dict):
+            ids = np.fromiter(population_fitness.keys(), dtype=np.int64, count=len(population_fitness))
+            fitness = np.fromiter(population_fitness.values(), dtype=np.float64, count=len(population_fitness))
+        else:
+            fitness = np.asarray(population_fitness, dtype=np.float64)
+            ids = np.arange(1, len(fitness) + 1)
+        cumulative_fitness = np.cumsum(fitness)
+        if cumulative_fitness[-1] > 0:
+            cumulative_fitness /= cumulative_fitness[-1]
+        else:
+            # Without any fitness every individual has the same chance
+            cumulative_fitness = np.arange(1, len(fitness) + 1) / len(fitness)
+        return ids, fitness, cumulative_fitness
+
+    @staticmethod
+    def _sample(cumulative_fitness: np.ndarray, pointers: np.ndarray) -> np.ndarray:
+        """
+        Finds the individual that each pointer falls on
+        :param cumulative_fitness: normalized cumulative fitness
+        :param pointers: values in the range [0-1)
+        :return: indices of the individuals
+        """
+        # Rounding can leave the last cumulative value slightly under the pointers
+        return np.minimum(np.searchsorted(cumulative_fitness, pointers), len(cumulative_fitness) - 1)
+
+    @staticmethod
+    def stochastic(num_parents: int, population_fitness: dict[int, float] | np.ndarray,
+                   rng: np.random.Generator | None = None) -> np.ndarray:
         """
         Stochastic universal sampling
         :param num_parents: number of parents to be selected
         :param population_fitness: list of individuals fitness and their ids
-        :return parents: list of the selected parents for reproduction
+        :param rng: random generator
+        :return parents: ids of the selected parents for reproduction
         """
-        fitness_sum = sum(individual for individual in population_fitness.values())
-        normalized_fitness = [individual / fitness_sum for individual in population_fitness.values()]
-        cumulative_fitness = [sum(normalized_fitness[:i+1]) for i in range(len(normalized_fitness))]
+        ids, _, cumulative_fitness = _Selection._cumulative(population_fitness)
         step = 1 / num_parents
-        pointer = random.uniform(0, step)
-        index = 0
-        parents = []
-        while len(parents) < num_parents:
-            if pointer <= cumulative_fitness[index]:
-                while pointer <= cumulative_fitness[index]:
-                    parents.append(index + 1)
-                    pointer += step
-            index += 1
-        return parents
+        pointers = _generator(rng).uniform(0, step) + step * np.arange(num_parents)
+        return ids[_Selection._sample(cumulative_fitness, pointers)]
 
     @staticmethod
-    def roulette_wheel(num_parents: int, population_fitness: dict[int, float]) -> list[int]:
+    def roulette_wheel(num_parents: int, population_fitness: dict[int, float] | np.ndarray,
+                       rng: np.random.Generator | None = None) -> np.ndarray:
         """
          Roulette wheel sampling
          :param num_parents: number of parents to selected
          :param population_fitness: list of individuals fitness and their ids
-         :return parents: list of the selected parents for reproduction
+         :param rng: random generator
+         :return parents: ids of the selected parents for reproduction
          """
-        fitness_sum = sum(individual for individual in population_fitness.values())
-        normalized_fitness = [individual / fitness_sum for individual in population_fitness.values()]
-        cumulative_fitness = [sum(normalized_fitness[:i + 1]) for i in range(len(normalized_fitness))]
-        parents = []
-        while len(parents) < num_parents:
-            index = 1
-            pointer = 0
-            selected = random.uniform(0, 1)
-            for fitness in cumulative_fitness:
-                pointer += fitness
-                if pointer >= selected:
-                    parents.append(index)
-                    break
-                index += 1
-        return parents
-
-    @staticmethod
-    def tournament(num_parents: int, population_fitness: dict[int, float], tournament_size: int) -> list[int]:
-        """
-        Tournament sampling
+        ids, _, cumulative_fitness = _Selection._cumulative(population_fitness)
+        pointers = _generator(rng).uniform(0, 1, num_parents)
+        return ids[_Selection._sample(cumulative_fitness, pointers)]
+
+    @staticmethod
+    def tournament(num_parents: int, population_fitness: dict[int, float] | np.ndarray, tournament_size: int,
+                   rng: np.random.Generator | None = None) -> np.ndarray:
+        """
+        Tournament sampling, the contenders of each tournament are chosen by stochastic universal sampling
         :param num_parents: number of parents to be selected
         :param population_fitness: parents fitness and its ids
         :param tournament_size: number of individuals by tournament
-        :return: list of the selected parents for reproduction
+        :param rng: random generator
+        :return: ids of the selected parents for reproduction
         """
         if tournament_size < 2:
             raise ValueError('Tournament size should equal or higher than 2')
-        parents = []
-        for _ in range(num_parents):
-            contenders = _Selection.stochastic(tournament_size, population_fitness)
-            winner = max(contenders, key=lambda fitness: population_fitness[fitness])
-            parents.append(winner)
-        return parents
+        ids, fitness, cumulative_fitness = _Selection._cumulative(population_fitness)
+        # One row of pointers per tournament
+        step = 1 / tournament_size
+        pointers = _generator(rng).uniform(0, step, (num_parents, 1)) + step * np.arange(tournament_size)
+        contenders = _Selection._sample(cumulative_fitness, pointers)
+        winners = contenders[np.arange(num_parents), np.argmax(fitness[contenders], axis=1)]
+        return ids[winners]
 
 
 class _Crossover:
     """
-    This class is meant to contain all the different reproduction techniques over a population
+    This class is meant to contain all the different reproduction techniques over a population.
+    Every technique accepts an 'out' pair of arrays where the children are written, for example the rows of the
+    individuals being replaced, otherwise new arrays are produced
     """
     @staticmethod
-    def uniform(parent1: np.ndarray, parent2: np.ndarray) -> list[np.ndarray]:
+    def _children(parent: np.ndarray, out: tuple[np.ndarray, np.ndarray] | None) -> list[np.ndarray]:
+        """
+        Produces the arrays where the children are written
+        :param parent: one of the parents
+        :param out: pair of arrays given by the caller if any
+        :return: a list with the two arrays
+        """
+        if out is None:
+            return [np.empty_like(parent), np.empty_like(parent)]
+        return [out[0], out[1]]
+
+    @staticmethod
+    def uniform(parent1: np.ndarray, parent2: np.ndarray, out: tuple[np.ndarray, np.ndarray] | None = None,
+                rng: np.random.Generator | None = None) -> list[np.ndarray]:
         """
         Uniform crossover
         :param parent1:
         :param parent2:
+        :param out: arrays where to write the children
+        :param rng: random generator
         :return: a list with the new two individuals
         """
-        children1 = parent1.copy()
-        children2 = parent2.copy()
-        random_vector = np.random.uniform(0, 1, size=parent1.shape)
-        children1[random_vector > 0.5] = parent2[random_vector > 0.5]
-        children2[random_vector > 0.5] = parent1[random_vector > 0.5]
+        children1, children2 = _Crossover._children(parent1, out)
+        random_vector = _generator(rng).uniform(0, 1, size=parent1.shape)
+        mask = random_vector > 0.5
+        np.copyto(children1, np.where(mask, parent2, parent1))
+        np.copyto(children2, np.where(mask, parent1, parent2))
         return [children1, children2]
 
     @staticmethod
-    def sp_arithmetic(parent1: np.ndarray, parent2: np.ndarray, alpha: float) -> list[np.ndarray]:
+    def sp_arithmetic(parent1: np.ndarray, parent2: np.ndarray, alpha: float,
+                      out: tuple[np.ndarray, np.ndarray] | None = None,
+                      rng: np.random.Generator | None = None) -> list[np.ndarray]:
         """
         Single point arithmetic crossover
         :param parent1:
         :param parent2:
         :param alpha: range[0-1] factor used to determine how much influence has a parent in one of the children genes
+        :param out: arrays where to write the children
+        :param rng: random generator
         :return: a list with the new two individuals
         """
-        cross_point = random.randint(1, len(parent1) - 1)
+        children1, children2 = _Crossover._children(parent1, out)
+        cross_point = int(_generator(rng).integers(1, len(parent1)))
         blended_p1 = parent1[cross_point:] * alpha + parent2[cross_point:] * (1 - alpha)
         blended_p2 = parent2[cross_point:] * alpha + parent1[cross_point:] * (1 - alpha)
-        children1 = np.concatenate((parent1[:cross_point], blended_p1))
-        children2 = np.concatenate((parent2[:cross_point], blended_p2))
+        children1[:cross_point] = parent1[:cross_point]
+        children1[cross_point:] = blended_p1
+        children2[:cross_point] = parent2[:cross_point]
+        children2[cross_point:] = blended_p2
         return [children1, children2]
 
     @staticmethod
-    def whole_arithmetic(parent1: np.ndarray, parent2: np.ndarray, alpha: float) -> list[np.ndarray]:
+    def whole_arithmetic(parent1: np.ndarray, parent2: np.ndarray, alpha: float,
+                         out: tuple[np.ndarray, np.ndarray] | None = None,
+                         rng: np.random.Generator | None = None) -> list[np.ndarray]:
         """
         Whole arithmetic crossover
         :param parent1:
         :param parent2:
         :param alpha: [0-1] factor used to determine how much influence has a parent in one of the children genes
+        :param out: arrays where to write the children
+        :param rng: random generator, unused as the crossover is deterministic
         :return: a list with the new two individuals
         """
-        children1 = parent1 * alpha + parent2 * (1 - alpha)
-        children2 = parent2 * alpha + parent1 * (1 - alpha)
+        children1, children2 = _Crossover._children(parent1, out)
+        blended_p1 = parent1 * alpha + parent2 * (1 - alpha)
+        blended_p2 = parent2 * alpha + parent1 * (1 - alpha)
+        children1[:] = blended_p1
+        children2[:] = blended_p2
         return [children1, children2]
 
     @staticmethod
-    def sbx(parent1: np.ndarray, parent2: np.ndarray, eta: float) -> list[np.ndarray, np.ndarray]:
+    def sbx(parent1: np.ndarray, parent2: np.ndarray, eta: float, out: tuple[np.ndarray, np.ndarray] | None = None,
+            rng: np.random.Generator | None = None) -> list[np.ndarray, np.ndarray]:
         """
         This crossover is specific to floating-point representation.
         Simulate behavior of one-point crossover for binary representations.
@@ -199,8 +233,9 @@ class _Crossover:
         For small values of eta, offspring will be more distant from parents
         Source : https://github.com/Chrispresso/SnakeAI
         """
+        children1, children2 = _Crossover._children(parent1, out)
         # Calculate Gamma
-        rand = np.random.random(parent1.shape)
+        rand = _generator(rng).random(parent1.shape)
         gamma = np.empty(parent1.shape)
         gamma[rand <= 0.5] = (2 * rand[rand <= 0.5]) ** (1.0 / (eta + 1))  # First case
         gamma[rand > 0.5] = (1.0 / (2.0 * (1.0 - rand[rand > 0.5]))) ** (1.0 / (eta + 1))  # Second case
@@ -209,8 +244,10 @@ class _Crossover:
         chromosome1 = 0.5 * ((1 + gamma) * parent1 + (1 - gamma) * parent2)
         # Calculate Child 2 chromosome
         chromosome2 = 0.5 * ((1 - gamma) * parent1 + (1 + gamma) * parent2)
+        children1[:] = chromosome1
+        children2[:] = chromosome2
 
-        return [chromosome1, chromosome2]
+        return [children1, children2]
 
 
 class _Mutation:
@@ -218,16 +255,144 @@ class _Mutation:
     This class contains all the different mutation techniques over individuals
     """
     @staticmethod
-    def gaussian(individual: np.ndarray, mutation_rate: float, sigma: float) -> np.ndarray:
+    def gaussian(individual: np.ndarray, mutation_rate: float, sigma: float, out: np.ndarray | None = None,
+                 rng: np.random.Generator | None = None) -> np.ndarray:
         """
         Gaussian mutation
         :param individual: individual to which to apply the mutation
         :param mutation_rate: probability that has each gene to mutate
         :param sigma: variance for the gaussian distribution with mean 0
+        :param out: array where to write the mutated individual, it can be the individual itself
+        :param rng: random generator
         :return: mutated individual
         """
-        random_vector = np.random.uniform(0, 1, individual.shape)
+        rng = _generator(rng)
+        random_vector = rng.uniform(0, 1, individual.shape)
         mask = random_vector <= mutation_rate
-        mutation = np.random.normal(loc=0, scale=sigma, size=individual.shape)
-        individual = np.where(mask, individual + mutation, individual)
-        return individual
+        mutation = rng.normal(loc=0, scale=sigma, size=individual.shape)
+        if out is None:
+            return np.where(mask, individual + mutation, individual)
+        if out is not individual:
+            out[:] = individual
+        out[mask] += mutation[mask]
+        return out
+
+
+class _BatchCrossover:
+    """
+    Crossover techniques applied to many couples at once, the parents are given as (couples, length) matrices where
+    the row i of both matrices forms a couple. All the random numbers are drawn in one call and the children are
+    written in the 'out' pair of matrices if given
+    """
+    @staticmethod
+    def _children(parents: np.ndarray, out: tuple[np.ndarray, np.ndarray] | None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Produces the matrices where the children are written
+        :param parents: one of the parents matrices
+        :param out: pair of matrices given by the caller if any
+        :return: the two matrices
+        """
+        if out is None:
+            return np.empty_like(parents), np.empty_like(parents)
+        return out[0], out[1]
+
+    @staticmethod
+    def uniform(parents1: np.ndarray, parents2: np.ndarray, out: tuple[np.ndarray, np.ndarray] | None = None,
+                rng: np.random.Generator | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Uniform crossover
+        :param parents1: first parent of each couple
+        :param parents2: second parent of each couple
+        :param out: matrices where to write the first and the second child of each couple
+        :param rng: random generator
+        :return: the children matrices
+        """
+        children1, children2 = _BatchCrossover._children(parents1, out)
+        mask = _generator(rng).uniform(0, 1, size=parents1.shape) > 0.5
+        np.copyto(children1, np.where(mask, parents2, parents1))
+        np.copyto(children2, np.where(mask, parents1, parents2))
+        return children1, children2
+
+    @staticmethod
+    def sp_arithmetic(parents1: np.ndarray, parents2: np.ndarray, alpha: float,
+                      out: tuple[np.ndarray, np.ndarray] | None = None,
+                      rng: np.random.Generator | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Single point arithmetic crossover, every couple has its own cross point
+        :param parents1: first parent of each couple
+        :param parents2: second parent of each couple
+        :param alpha: range[0-1] factor used to determine how much influence has a parent in one of the children genes
+        :param out: matrices where to write the first and the second child of each couple
+        :param rng: random generator
+        :return: the children matrices
+        """
+        children1, children2 = _BatchCrossover._children(parents1, out)
+        cross_points = _generator(rng).integers(1, parents1.shape[1], size=(parents1.shape[0], 1))
+        mask = np.arange(parents1.shape[1]) >= cross_points
+        np.copyto(children1, np.where(mask, parents1 * alpha + parents2 * (1 - alpha), parents1))
+        np.copyto(children2, np.where(mask, parents2 * alpha + parents1 * (1 - alpha), parents2))
+        return children1, children2
+
+    @staticmethod
+    def whole_arithmetic(parents1: np.ndarray, parents2: np.ndarray, alpha: float,
+                         out: tuple[np.ndarray, np.ndarray] | None = None,
+                         rng: np.random.Generator | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Whole arithmetic crossover
+        :param parents1: first parent of each couple
+        :param parents2: second parent of each couple
+        :param alpha: [0-1] factor used to determine how much influence has a parent in one of the children genes
+        :param out: matrices where to write the first and the second child of each couple
+        :param rng: random generator, unused as the crossover is deterministic
+        :return: the children matrices
+        """
+        children1, children2 = _BatchCrossover._children(parents1, out)
+        np.copyto(children1, parents1 * alpha + parents2 * (1 - alpha))
+        np.copyto(children2, parents2 * alpha + parents1 * (1 - alpha))
+        return children1, children2
+
+    @staticmethod
+    def sbx(parents1: np.ndarray, parents2: np.ndarray, eta: float, out: tuple[np.ndarray, np.ndarray] | None = None,
+            rng: np.random.Generator | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Simulated binary crossover, see _Crossover.sbx
+        :param parents1: first parent of each couple
+        :param parents2: second parent of each couple
+        :param eta: distribution index, the higher the closer the children are to the parents
+        :param out: matrices where to write the first and the second child of each couple
+        :param rng: random generator
+        :return: the children matrices
+        """
+        children1, children2 = _BatchCrossover._children(parents1, out)
+        rand = _generator(rng).random(parents1.shape)
+        gamma = np.where(rand <= 0.5, 2 * rand, 1.0 / (2.0 * (1.0 - rand))) ** (1.0 / (eta + 1))
+        np.copyto(children1, 0.5 * ((1 + gamma) * parents1 + (1 - gamma) * parents2))
+        np.copyto(children2, 0.5 * ((1 - gamma) * parents1 + (1 + gamma) * parents2))
+        return children1, children2
+
+
+class _BatchMutation:
+    """
+    Mutation techniques applied to many individuals at once, given as a (individuals, length) matrix
+    """
+    @staticmethod
+    def gaussian(individuals: np.ndarray, mutation_rate: float, sigma: float, out: np.ndarray | None = None,
+                 rng: np.random.Generator | None = None) -> np.ndarray:
+        """
+        Gaussian mutation
+        :param individuals: individuals to which to apply the mutation
+        :param mutation_rate: probability that has each gene to mutate
+        :param sigma: variance for the gaussian distribution with mean 0
+        :param out: matrix where to write the mutated individuals, it can be the individuals matrix itself
+        :param rng: random generator
+        :return: mutated individuals
+        """
+        rng = _generator(rng)
+        mask = rng.uniform(0, 1, individuals.shape) <= mutation_rate
+        mutation = rng.normal(loc=0, scale=sigma, size=individuals.shape)
+        if out is None:
+            return np.where(mask, individuals + mutation, individuals)
+        if out is not individuals:
+            out[:] = individuals
+        out[mask] += mutation[mask]
+        return out
@@ -0,0 +1,78 @@
+# This module contains the class that holds the codification of a whole population in shared memory
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from multiprocessing import shared_memory
+import numpy as np
+import weakref
+import os
+
+
+class GenomeMatrix:
+    """
+    Holds the NN codification of every individual of a population as one contiguous (individuals, length) array
+    placed in shared memory. Pickling an instance just sends the name of the memory block, the receiving process
+    attaches to the same block, so the genomes are never serialized
+    """
+    def __init__(self, individuals: int, length: int):
+        """
+        Constructor
+        :param individuals: number of individuals, one row each
+        :param length: length of the codification of an individual
+        """
+        self._shape = (individuals, length)
+        self._memory = shared_memory.SharedMemory(create=True, size=max(1, individuals * length * 8))
+        self._array = np.ndarray(self._shape, dtype=np.float64, buffer=self._memory.buf)
+        self._array[:] = 0
+        # Just the creator process releases the block
+        self._finalizer = weakref.finalize(self, GenomeMatrix._release, self._memory, os.getpid())
+
+    def __getstate__(self) -> dict:
+        return {'name': self._memory.name, 'shape': self._shape}
+
+    def __setstate__(self, state: dict) -> None:
+        self._shape = state['shape']
+        self._memory = shared_memory.SharedMemory(name=state['name'])
+        self._array = np.ndarray(self._shape, dtype=np.float64, buffer=self._memory.buf)
+        self._finalizer = weakref.finalize(self, GenomeMatrix._release, self._memory, None)
+
+    @staticmethod
+    def _release(memory: shared_memory.SharedMemory, owner: int | None) -> None:
+        """
+        Closes the memory block and removes it if the current process is its creator
+        :param memory: shared memory block
+        :param owner: pid of the creator process
+        :return:
+        """
+        try:
+            memory.close()
+        except BufferError:
+            # Views of the block are still alive, they keep the mapping until they are collected
+            pass
+        if owner == os.getpid():
+            try:
+                memory.unlink()
+            except FileNotFoundError:
+                pass
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        (individuals, length) array placed in the shared memory block
+        :return:
+        """
+        return self._array
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self._shape
+
+    def row(self, index: int) -> np.ndarray:
+        """
+        Produces a view of the codification of an individual
+        :param index: row index
+        :return: 1D-array view
+        """
+        return self._array[index]
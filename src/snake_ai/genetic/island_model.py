@@ -0,0 +1,218 @@
+# This module contains the class that evolves several sub-populations in parallel exchanging their best individuals
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.snake.game_process.snake_batch_process import SnakeBatch
+from snake_ai.genetic.optimizer_abc import Optimizer
+from snake_ai.genetic.genome_matrix import GenomeMatrix
+from snake_ai.data import StatsTable
+from numpy.lib import recfunctions
+from multiprocessing import Process, Queue, Barrier, Value
+from threading import BrokenBarrierError
+from queue import Empty
+import numpy as np
+
+
+class IslandModel:
+    """
+    Island model GA, every island is a sub-population with its own batch and optimizer evolving in its own process,
+    there is no central selection. Every few generations each island sends copies of its best individuals to the next
+    island of a ring, which replace its worst ones. The migrants travel through a board placed in shared memory
+    """
+    def __init__(self, islands: list[tuple[SnakeBatch, Optimizer]], migrants: int, interval: int):
+        """
+        Constructor
+        :param islands: batch and optimizer of each island
+        :param migrants: number of individuals sent by every island in each migration
+        :param interval: generations between migrations
+        """
+        smallest = min(batch.genomes.shape[0] for batch, _ in islands)
+        if migrants < 0 or 2 * migrants > smallest:
+            raise ValueError(f"Migrants must be between 0 and half of the smallest island ({smallest // 2}). "
+                             f"Found: {migrants}")
+        if interval < 1:
+            raise ValueError(f"Migration interval must be at least one generation. Found: {interval}")
+        self._islands = islands
+        self._migrants = migrants
+        self._interval = interval
+        # First id of each island within the whole population
+        self._offsets = np.cumsum([0] + [batch.genomes.shape[0] for batch, _ in islands])
+        length = islands[0][0].genomes.shape[1]
+        self._genome_board = GenomeMatrix(len(islands) * migrants, length)
+        self._stats_board = GenomeMatrix(len(islands) * migrants, len(StatsTable.dtype.names))
+        self._reports: Queue | None = None
+        self._processes: list[Process] = []
+
+    def __getstate__(self) -> dict:
+        # The island processes belong to the process that started them
+        state = self.__dict__.copy()
+        state['_reports'] = None
+        state['_processes'] = []
+        return state
+
+    @staticmethod
+    def island_seed(seed: int | None, island: int) -> int | None:
+        """
+        Produces the seed of an island from the seed of the training, every island gets an independent one
+        :param seed: seed of the training, None for unseeded trainings
+        :param island: island number
+        :return:
+        """
+        if seed is None:
+            return None
+        return int(np.random.SeedSequence(seed, spawn_key=(island,)).generate_state(1)[0])
+
+    @property
+    def islands(self) -> int:
+        return len(self._islands)
+
+    @property
+    def population(self) -> dict:
+        """
+        Population description in the format of SnakeBatch.population, the individuals of the islands are numbered
+        consecutively
+        :return:
+        """
+        population = dict(self._islands[0][0].population)
+        population['population'] = self.get_population_brains()
+        return population
+
+    def get_population_brains(self, genomes: list[np.ndarray] | None = None) -> dict[int, np.ndarray]:
+        """
+        Produces a dictionary with the id and the codification of each individual of all the islands
+        :param genomes: codification matrix of each island, the current content of the islands if None
+        :return population: the dictionary just described
+        """
+        if genomes is None:
+            genomes = [batch.genomes.array for batch, _ in self._islands]
+        population: dict[int, np.ndarray] = {}
+        for offset, matrix in zip(self._offsets, genomes):
+            for row, genome in enumerate(matrix):
+                population[int(offset) + row + 1] = genome
+        return population
+
+    def update_brains(self, brains: dict[int, np.ndarray]) -> None:
+        """
+        Updates the NN of the individuals of the islands
+        :param brains: codification of the individuals by id within the whole population
+        :return:
+        """
+        for id, brain in brains.items():
+            island = int(np.searchsorted(self._offsets, id, side='left')) - 1
+            self._islands[island][0].update_brains({id - int(self._offsets[island]): brain})
+
+    def start(self, alive: Value) -> None:
+        """
+        Starts the process of every island, they evolve while the alive flag is activated
+        :param alive: flag to control if the islands still alive
+        :return:
+        """
+        self._reports = Queue()
+        barrier = Barrier(len(self._islands))
+        for island, (batch, ga) in enumerate(self._islands):
+            process = Process(target=IslandModel._serve,
+                              args=(island, batch, ga, self._genome_board, self._stats_board, self._migrants,
+                                    self._interval, barrier, alive, self._reports))
+            process.start()
+            self._processes.append(process)
+
+    @staticmethod
+    def _serve(island: int, batch: SnakeBatch, ga: Optimizer, genome_board: GenomeMatrix, stats_board: GenomeMatrix,
+               migrants: int, interval: int, barrier: Barrier, alive: Value, reports: Queue) -> None:
+        """
+        Island loop, runs a generation, takes part in the migration when it is due and reports the generation
+        :param island: island number
+        :param batch: batch of the island
+        :param ga: optimizer of the island
+        :param genome_board: shared matrix where the migrants genomes are placed, a block of rows per island
+        :param stats_board: shared matrix where the migrants stats are placed, a block of rows per island
+        :param migrants: number of individuals sent by every island in each migration
+        :param interval: generations between migrations
+        :param barrier: barrier shared by all the islands to synchronize the migrations
+        :param alive: flag to control if the islands still alive
+        :param reports: queue where the report of every generation is put
+        :return:
+        """
+        generation = 0
+        try:
+            while alive.value:
+                batch.run()
+                generation += 1
+                scores = batch.results
+                if migrants > 0 and generation % interval == 0:
+                    scores = IslandModel._migrate(island, batch, ga, scores.copy(), genome_board, stats_board,
+                                                  migrants, barrier)
+                best, fitness = ga.next_gen(population=batch.genomes.array, scores=scores)
+                reports.put((island, generation, scores, fitness, batch.get_individual(best),
+                             batch.genomes.array.copy(), ga.parameters))
+        except BrokenBarrierError:
+            # Another island has stopped
+            pass
+        finally:
+            # The islands waiting for this one in a migration must not block
+            barrier.abort()
+            batch.close()
+
+    @staticmethod
+    def _migrate(island: int, batch: SnakeBatch, ga: Optimizer, scores: np.ndarray, genome_board: GenomeMatrix,
+                 stats_board: GenomeMatrix, migrants: int, barrier: Barrier) -> np.ndarray:
+        """
+        Places copies of the best individuals of the island in its block of the board and replaces the worst ones with
+        the migrants of the previous island of the ring. The migrants keep their stats, so they compete with their
+        fitness in the next selection
+        :param island: island number
+        :param batch: batch of the island
+        :param ga: optimizer of the island
+        :param scores: stats of the last run of the island, they are overwritten
+        :param genome_board: shared matrix where the migrants genomes are placed
+        :param stats_board: shared matrix where the migrants stats are placed
+        :param migrants: number of individuals sent by every island
+        :param barrier: barrier shared by all the islands
+        :return: stats of the island after the migration
+        """
+        islands = genome_board.shape[0] // migrants
+        genomes = batch.genomes.array
+        ranked = np.argsort(ga.fitness(scores), kind='stable')
+        sent, received = ranked[-migrants:], ranked[:migrants]
+        block = slice(island * migrants, (island + 1) * migrants)
+        genome_board.array[block] = genomes[sent]
+        stats_board.array[block] = recfunctions.structured_to_unstructured(scores[sent], dtype=np.float64)
+        barrier.wait()
+        source = (island - 1) % islands
+        block = slice(source * migrants, (source + 1) * migrants)
+        genomes[received] = genome_board.array[block]
+        scores[received] = recfunctions.unstructured_to_structured(stats_board.array[block], dtype=StatsTable.dtype)
+        scores['id'][received] = received + 1
+        # The board is not written again until every island has read its migrants
+        barrier.wait()
+        return scores
+
+    def report(self, timeout: float | None = None) -> tuple[int, int, np.ndarray, np.ndarray, dict, np.ndarray,
+                                                            dict]:
+        """
+        Waits for the next generation report of any island
+        :param timeout: maximum seconds to wait, forever if None
+        :return: island number, generation number, stats and fitness of the generation, best individual as in
+        SnakeBatch.get_individual, codification matrix of the island after the generation and parameters of its
+        optimizer, see Optimizer.parameters
+        """
+        return self._reports.get(timeout=timeout)
+
+    def close(self) -> None:
+        """
+        Waits for the islands to stop, the alive flag must be deactivated before, the reports not read are discarded
+        :return:
+        """
+        # The reports still in the queue must be read, otherwise the processes cannot end
+        while any(process.is_alive() for process in self._processes):
+            try:
+                self._reports.get(timeout=0.1)
+            except Empty:
+                pass
+        for process in self._processes:
+            process.join()
+        self._processes.clear()
+        for batch, _ in self._islands:
+            batch.close()
@@ -0,0 +1,64 @@
+# This module contains the API for implementing the classes that optimize a population of NN codifications
+# from the performance of its individuals
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.genetic.genetic_functions import GAFunctionFactory
+from abc import abstractmethod, ABC
+import numpy as np
+
+
+class Optimizer(ABC):
+
+    def __init__(self, fitness: str, seed: int | None = None):
+        """
+        Constructor
+        :param fitness: fitness function name, see GAFunctionFactory
+        :param seed: seed of the random stream of the optimizer, the process is reproducible with it
+        """
+        self._factory = GAFunctionFactory()
+        # Every random operation of the process is taken from this stream, a seed makes it reproducible
+        self._rng = np.random.default_rng(seed)
+        self._fitness = self._factory.get_function('fitness', fitness)
+
+    @property
+    def parameters(self) -> dict:
+        """
+        Current values of the parameters the optimizer adapts along the training, they are reported with the
+        generation stats
+        :return:
+        """
+        return {}
+
+    def fitness(self, scores: np.ndarray) -> np.ndarray:
+        """
+        Calculates the fitness of some individuals
+        :param scores: structured array with the performance stats of each individual, see StatsTable
+        :return: fitness value of each row of the stats
+        """
+        return self._fitness(scores)
+
+    def population_fitness(self, scores: np.ndarray) -> np.ndarray:
+        """
+        Calculates the fitness of a whole population
+        :param scores: structured array with the performance stats of each individual, see StatsTable. The ids go
+        from 1 to the number of individuals
+        :return: fitness of each individual, the individual with id i is the position i - 1
+        """
+        population_fitness = np.empty(len(scores))
+        population_fitness[scores['id'] - 1] = self.fitness(scores)
+        return population_fitness
+
+    @abstractmethod
+    def next_gen(self, population: dict[int, np.ndarray] | np.ndarray, scores: np.ndarray) -> tuple[int, np.ndarray]:
+        """
+        This method must produce the next generation writing it directly into the population
+        :param population: codification of each individual by id, or a (individuals, length) matrix where the
+        individual with id i is the row i - 1, as a GenomeMatrix array. The arrays are overwritten
+        :param scores: structured array with the performance stats of each individual, see StatsTable. The ids go
+        from 1 to the number of individuals
+        :return: id of the best individual and the fitness of the population, the fitness of the individual with id i
+        is the position i - 1
+        """
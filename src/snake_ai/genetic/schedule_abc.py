@@ -0,0 +1,77 @@
+# This module contains the API for implementing the classes that control the mutation strength along a training
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+class MutationSchedule(ABC):
+    """
+    Controls the mutation rate and the sigma of the mutation along the training. The GA steps the schedule once per
+    generation and lets it mutate the children, so a schedule can also keep its own state per individual
+    """
+    def __init__(self, mutation_rate: float, sigma: float | None):
+        """
+        Constructor
+        :param mutation_rate: initial probability that has each gene to mutate
+        :param sigma: initial sigma of the mutation, None if the mutation function does not take it
+        """
+        if not 0 <= mutation_rate <= 1:
+            raise ValueError(f"Mutation rate must be between 0 and 1. Found: {mutation_rate}")
+        self._mutation_rate = mutation_rate
+        self._sigma = sigma
+
+    @property
+    def mutation_rate(self) -> float:
+        return self._mutation_rate
+
+    @property
+    def sigma(self) -> float | None:
+        return self._sigma
+
+    @property
+    def values(self) -> dict:
+        """
+        Current values of the schedule, they are reported with the generation stats
+        :return:
+        """
+        values = {'mutation_rate': float(self.mutation_rate)}
+        if self.sigma is not None:
+            values['sigma'] = float(self.sigma)
+        return values
+
+    @abstractmethod
+    def step(self, generations: float, success: float | None) -> None:
+        """
+        This method must update the values used for the next children
+        :param generations: generations elapsed since the start of the training
+        :param success: fraction of the last evaluated children whose fitness is better than the mean fitness of their
+        parents, None if no child has been evaluated since the last step
+        :return:
+        """
+
+    def mutate(self, mutation, children: np.ndarray, couples: np.ndarray, params: dict,
+               rng: np.random.Generator) -> None:
+        """
+        Mutates the children in place with the current values
+        :param mutation: batch mutation function, see _BatchMutation
+        :param children: (offspring, length) array, consecutive rows are siblings
+        :param couples: ids of the parents of each couple of siblings, one couple per row
+        :param params: parameters of the mutation function
+        :param rng: random generator
+        :return:
+        """
+        if self._sigma is not None:
+            params = params | {'sigma': self._sigma}
+        mutation(children, self._mutation_rate, out=children, rng=rng, **params)
+
+    def replace(self, replaced: np.ndarray) -> None:
+        """
+        Notifies which individuals hold the last mutated children, the schedules that keep state per individual must
+        move it with them
+        :param replaced: ids of the individuals replaced, in the order of the children
+        :return:
+        """
@@ -0,0 +1,33 @@
+# This module contains a factory class for the different implementations of the mutation schedules
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.class_factory_abc import FactoryABS
+import snake_ai.genetic.schedules as schedules
+
+
+class ScheduleFactory(FactoryABS):
+    """
+    Implements a factory for MutationSchedule like objects
+    """
+    def __init__(self):
+        super().__init__(schedules)
+
+    def get_instance(self, schedule_name: str, mutation_rate: float, sigma: float | None,
+                     **params) -> schedules.MutationSchedule:
+        """
+        Creates an instance of a MutationSchedule like object
+        :param schedule_name: schedule name in snake case, e.g. 'one_fifth' for the OneFifth class
+        :param mutation_rate: initial probability that has each gene to mutate
+        :param sigma: initial sigma of the mutation, None if the mutation function does not take it
+        :param params: specific parameters of the schedule
+        :return instance: object instance
+        """
+        name = ''.join(part.capitalize() for part in schedule_name.split('_'))
+        if name in self._classes:
+            return self._classes[name](mutation_rate=mutation_rate, sigma=sigma, **params)
+        else:
+            raise ValueError(f"No implementation found with the name: {schedule_name}."
+                             f" Found implementations: {self._classes.keys()}")
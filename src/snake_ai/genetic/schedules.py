@@ -0,0 +1,178 @@
+# This module contains the implementation of the mutation schedules
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.genetic.schedule_abc import MutationSchedule
+from abc import abstractmethod
+import numpy as np
+
+
+class Constant(MutationSchedule):
+    """
+    Keeps the configured mutation rate and sigma for the whole training
+    """
+    def step(self, generations: float, success: float | None) -> None:
+        pass
+
+
+class Decay(MutationSchedule):
+    """
+    Base of the schedules that scale down the mutation rate and the sigma with the generations, from their configured
+    values to a fraction of them
+    """
+    def __init__(self, mutation_rate: float, sigma: float | None, generations: int = 500, final: float = 0.1):
+        """
+        Constructor
+        :param mutation_rate: initial probability that has each gene to mutate
+        :param sigma: initial sigma of the mutation, None if the mutation function does not take it
+        :param generations: generations to reach the final values, they are kept from then on
+        :param final: final values as a fraction of the initial ones
+        """
+        super().__init__(mutation_rate=mutation_rate, sigma=sigma)
+        if generations < 1:
+            raise ValueError(f"Decay generations must be at least one. Found: {generations}")
+        if not 0 <= final <= 1:
+            raise ValueError(f"Final fraction must be between 0 and 1. Found: {final}")
+        self._initial = (mutation_rate, sigma)
+        self._generations = generations
+        self._final = final
+
+    def step(self, generations: float, success: float | None) -> None:
+        scale = self._final + (1 - self._final) * self._shape(min(1.0, generations / self._generations))
+        self._mutation_rate = self._initial[0] * scale
+        if self._initial[1] is not None:
+            self._sigma = self._initial[1] * scale
+
+    @staticmethod
+    @abstractmethod
+    def _shape(progress: float) -> float:
+        """
+        This method must give the scale of the decay
+        :param progress: fraction of the decay generations elapsed
+        :return: 1 at the start and 0 at the end
+        """
+
+
+class Linear(Decay):
+    """
+    Linear decay of the mutation rate and the sigma
+    """
+    @staticmethod
+    def _shape(progress: float) -> float:
+        return 1 - progress
+
+
+class Cosine(Decay):
+    """
+    Cosine decay of the mutation rate and the sigma, it stays close to the initial values at the start and to the
+    final ones at the end
+    """
+    @staticmethod
+    def _shape(progress: float) -> float:
+        return 0.5 * (1 + np.cos(np.pi * progress))
+
+
+class OneFifth(MutationSchedule):
+    """
+    1/5th success rule, the sigma grows while more than a fifth of the children improve their parents and shrinks
+    while less do. The games of the children differ from the ones of their parents, so with noisy evaluations a lower
+    target can be more suitable
+    """
+    def __init__(self, mutation_rate: float, sigma: float | None, factor: float = 0.82, target: float = 0.2,
+                 minimum: float = 1e-5):
+        """
+        Constructor
+        :param mutation_rate: probability that has each gene to mutate
+        :param sigma: initial sigma of the mutation
+        :param factor: factor that shrinks the sigma in each step, its inverse grows it
+        :param target: success rate that keeps the sigma
+        :param minimum: lower bound of the sigma
+        """
+        super().__init__(mutation_rate=mutation_rate, sigma=sigma)
+        if sigma is None or sigma <= 0:
+            raise ValueError(f"The 1/5th success rule needs a positive mutation sigma. Found: {sigma}")
+        if not 0 < factor < 1:
+            raise ValueError(f"Factor must be between 0 and 1. Found: {factor}")
+        if not 0 < target < 1:
+            raise ValueError(f"Target success rate must be between 0 and 1. Found: {target}")
+        self._factor = factor
+        self._target = target
+        self._minimum = minimum
+
+    def step(self, generations: float, success: float | None) -> None:
+        if success is None:
+            return
+        if success > self._target:
+            self._sigma /= self._factor
+        elif success < self._target:
+            self._sigma = max(self._sigma * self._factor, self._minimum)
+
+
+class SelfAdaptive(MutationSchedule):
+    """
+    Self-adaptive gaussian mutation, every gene of every individual has its own sigma kept in a matrix alongside the
+    genome matrix. The children get the sigmas of their parents recombined, the sigmas of the genes that mutate are
+    perturbed with a log-normal noise before being used, so the sigmas that produce better children spread with
+    them. It replaces the mutation function of the GA
+    """
+    def __init__(self, mutation_rate: float, sigma: float | None, minimum: float = 1e-5):
+        """
+        Constructor
+        :param mutation_rate: probability that has each gene to mutate
+        :param sigma: initial sigma of every gene
+        :param minimum: lower bound of the sigmas
+        """
+        super().__init__(mutation_rate=mutation_rate, sigma=sigma)
+        if sigma is None or sigma <= 0:
+            raise ValueError(f"Self-adaptive mutation needs a positive mutation sigma. Found: {sigma}")
+        self._minimum = minimum
+        # Sigmas of the individual with id i in the row i - 1, the rows are added as the ids appear
+        self._sigmas = np.zeros((0, 0))
+        self._children: np.ndarray | None = None
+
+    @property
+    def sigma(self) -> float:
+        """
+        Mean sigma of the population
+        :return:
+        """
+        return float(self._sigmas.mean()) if self._sigmas.size else self._sigma
+
+    @property
+    def sigmas(self) -> np.ndarray:
+        return self._sigmas
+
+    def _grow(self, individuals: int, length: int) -> None:
+        """
+        Adds the rows of the ids not seen yet with the initial sigma
+        :param individuals: number of rows needed
+        :param length: codification length
+        :return:
+        """
+        if individuals > self._sigmas.shape[0]:
+            self._sigmas = np.concatenate([self._sigmas.reshape(-1, length),
+                                           np.full((individuals - self._sigmas.shape[0], length), self._sigma)])
+
+    def step(self, generations: float, success: float | None) -> None:
+        pass
+
+    def mutate(self, mutation, children: np.ndarray, couples: np.ndarray, params: dict,
+               rng: np.random.Generator) -> None:
+        offspring, length = children.shape
+        self._grow(int(couples.max()), length)
+        # Siblings share the geometric mean of the sigmas of their parents, the log-normal perturbation does not drift
+        # it
+        sigmas = np.repeat(np.exp(np.log(self._sigmas[couples - 1]).mean(axis=1)), 2, axis=0)[:offspring]
+        # Learning rates of the common and the per gene perturbations
+        tau_common, tau_gene = 1 / np.sqrt(2 * length), 1 / np.sqrt(2 * np.sqrt(length))
+        mask = rng.uniform(0, 1, children.shape) <= self._mutation_rate
+        noise = tau_common * rng.standard_normal((offspring, 1)) + tau_gene * rng.standard_normal(children.shape)
+        sigmas[mask] = np.maximum(sigmas[mask] * np.exp(noise[mask]), self._minimum)
+        children[mask] += sigmas[mask] * rng.standard_normal(int(mask.sum()))
+        self._children = sigmas
+
+    def replace(self, replaced: np.ndarray) -> None:
+        self._grow(int(replaced.max(initial=0)), self._children.shape[1])
+        self._sigmas[replaced - 1] = self._children[:len(replaced)]
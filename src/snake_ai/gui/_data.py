@@ -57,6 +57,7 @@ class GeneticConfig:
                                           'Uniform': ''}
         self.mutation: dict[str, str] = {'Gaussian': self.sigma}
         self.replacement: list[str] = ['Steady-State', 'Generational']
+        self.schedule: list[str] = ['Constant', 'Linear', 'Cosine', '1/5th Rule', 'Self-Adaptive']
         self.hyperparams_range: dict[str, tuple[int, int]] = {self.alpha: (0, 1, 0.01),
                                                               self.eta: (0, 500, 1),
                                                               self.sigma: (0, 1, 0.01)}
@@ -94,6 +95,8 @@ class DropDownMapping:
                         'whole_arithmetic': 'W Arithmetic', 'sp_arithmetic': 'SP Arithmetic', 'sbx': 'SBX',
                         'uniform': 'Uniform', 'alpha': '\u03B1', 'eta': '\u03B7', 'gaussian': 'Gaussian',
                         'sigma': '\u03C3', 'steady_state': 'Steady-State', 'generational': 'Generational',
+                        'constant': 'Constant', 'linear': 'Linear', 'cosine': 'Cosine', 'one_fifth': '1/5th Rule',
+                        'self_adaptive': 'Self-Adaptive',
                         (10, 10): '10x10', (15, 15): '15x15', (20, 20): '20x20', (25, 25): '25x25'}
 
 
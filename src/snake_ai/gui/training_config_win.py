@@ -10,6 +10,7 @@ from snake_ai.gui.abc_win import WindowABC
 from snake_ai.gui.abc_panel import PanelABC
 from snake_ai.data import Population
 from snake_ai.data import Folders
+from snake_ai.trainer.population_log import PopulationLog
 import snake_ai.gui._data as data
 from tkinter import messagebox
 import customtkinter as ctk
@@ -193,7 +194,13 @@ class TrainingConfigWindow(WindowABC):
                 return
             if os.path.isfile(self._dialog_w.value):
                 try:
-                    prev_population = IO.load(self._dialog_w.value, dict)
+                    # Binary containers are validated from their header and the individuals logged since the last
+                    # snapshot are replayed. The codifications are read, not mapped, the population file is saved again
+                    # by the training checkpoints
+                    header = IO.load_population_header(self._dialog_w.value)
+                    prev_population = PopulationLog.load(self._dialog_w.value, mapped=False)
+                    if not isinstance(prev_population, dict):
+                        raise ValueError()
                     names = list(prev_population.keys())
                     pop_struct = vars(self._pop_data)
                     # Check if the instance conserve the original structure
@@ -216,9 +223,13 @@ class TrainingConfigWindow(WindowABC):
                         length += layers[i] * layers[i - 1]
                         if prev_population['bias']:
                             length += layers[i]
-                    for id, nn in prev_population['population'].items():
-                        if not isinstance(id, int) or not isinstance(nn, np.ndarray) or length != len(nn):
+                    if isinstance(header, dict):
+                        if header['length'] != length:
                             raise ValueError()
+                    else:
+                        for id, nn in prev_population['population'].items():
+                            if not isinstance(id, int) or not isinstance(nn, np.ndarray) or length != len(nn):
+                                raise ValueError()
                     self._dialog_w.error_var.set('')
                     self._propagate_settings(prev_population)
                     self._previous_pop_obj = prev_population['population']
@@ -435,6 +446,7 @@ class TrainingConfigWindow(WindowABC):
             self._mut_param_lb = ctk.CTkLabel(master=self, font=self._font)
             self._replacement_lb = ctk.CTkLabel(master=self, text="  Replacement", font=self._font)
             self._offspring_lb = ctk.CTkLabel(master=self, text="     Offspring", font=self._font)
+            self._schedule_lb = ctk.CTkLabel(master=self, text="  Mut. Schedule", font=self._font)
             # Widgets
             self._population_w = NumericEntry(master=self, from_=1, to=1000, step=10, type='int',
                                               label=self._population_lb)
@@ -462,6 +474,7 @@ class TrainingConfigWindow(WindowABC):
                                                 mouse_wheel_func=self._replacement_behavior)
             self._offspring_w = NumericEntry(master=self, from_=1, to=250, step=10, type='int',
                                              label=self._offspring_lb)
+            self._schedule_w = DropDownPanel(master=self, options=self._genetic_data.schedule)
 
             # Entries
             self.entries['population'] = self._population_w
@@ -475,6 +488,7 @@ class TrainingConfigWindow(WindowABC):
             self.entries['mutation_rate'] = self._mut_rate_w
             self.entries['replacement'] = self._replacement_w
             self.entries['offspring'] = self._offspring_w
+            self.entries['schedule'] = self._schedule_w
 
             # Placements
             self._population_lb.grid(column=0, row=1, sticky='w')
@@ -488,6 +502,7 @@ class TrainingConfigWindow(WindowABC):
             self._mut_rate_lb.grid(column=0, row=9, sticky='w')
             self._replacement_lb.grid(column=0, row=10, sticky='w')
             self._offspring_lb.grid(column=0, row=11, sticky='w')
+            self._schedule_lb.grid(column=0, row=12, sticky='w')
 
             self._population_w.grid(column=1, row=1, sticky='w', padx=2, pady=2)
             self._selection_w.grid(column=1, row=2, sticky='w', padx=2, pady=2)
@@ -500,6 +515,7 @@ class TrainingConfigWindow(WindowABC):
             self._mut_rate_w.grid(column=1, row=9, sticky='w', padx=2, pady=2)
             self._replacement_w.grid(column=1, row=10, sticky='w', padx=2, pady=2)
             self._offspring_w.grid(column=1, row=11, sticky='w', padx=2, pady=2)
+            self._schedule_w.grid(column=1, row=12, sticky='w', padx=2, pady=2)
 
             # Actions
             self._population_w.set('500')
@@ -534,7 +550,7 @@ class TrainingConfigWindow(WindowABC):
             self.rowconfigure(index=0, weight=1, uniform='s')
             for j in range(1, 17):
                 self.rowconfigure(index=j, weight=2, uniform='s')
-            self.rowconfigure(index=12, weight=1, uniform='s')
+            self.rowconfigure(index=13, weight=1, uniform='s')
             for i in range(2):
                 self.columnconfigure(index=i, weight=1, uniform='s')
 
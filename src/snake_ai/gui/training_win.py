@@ -632,5 +632,13 @@ class TrainingWindow(WindowABC):
             self._pgr_generation.configure(text=f'Generation: {self._iterations.get()}')
             self._pgr_best.configure(text=f'All Time Best Score: {self._best_score},'
                                           f'    Current Best Score: {plot_data["score_max"]}')
+            # The mutation values follow the schedule of the GA
+            parameters = plot_data['parameters']
+            if 'mutation_rate' in parameters:
+                self._conf_mut_rate_value.configure(text=f': {parameters["mutation_rate"]:.3g}')
+                if 'sigma' in parameters:
+                    self._conf_mut_value.configure(
+                        text=f': {self._short.names_map[self._config["mutation"]]}'
+                             f'({self._short.params_map[self._config["mutation"]]}={parameters["sigma"]:.3g})')
         thread = Thread(target=work)
         thread.start()
@@ -19,7 +19,8 @@ class NN:
     B_NAME = 'bias_'
 
     def __init__(self, input: int, output: int, hidden: list[int], output_init: str, bias: bool,
-                 hidden_init: str, output_act: str, hidden_act: str, bias_init: str = 'zero'):
+                 hidden_init: str, output_act: str, hidden_act: str, bias_init: str = 'zero',
+                 rng: np.random.Generator | None = None):
         """
         Constructor
         :param input: input nodes to the NN
@@ -31,6 +32,7 @@ class NN:
         :param hidden_init: hidden layers initialization method to be used
         :param output_act: output layer activation function
         :param hidden_act: hidden layers activation function
+        :param rng: random generator used by the initialization, the global numpy random state is used if None
         """
         if input < 1 or output < 1:
             raise ValueError(f"Input and output layer must contain at least 1 node. Found: (input_nodes:{input},"
@@ -54,9 +56,20 @@ class NN:
         self._w_matrices = {}
         self._activations = {}
         self._codification_info: dict[str, int | list[int]] = {}
-        self._dense_initialization()
+        self._code: np.ndarray | None = None
+        self._dense_initialization(rng)
         self._set_codification()
 
+    def __getstate__(self) -> dict:
+        # A bound NN is pickled with its own copy of the weights and biases
+        state = self.__dict__.copy()
+        state['_code'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_code', None)
+
     def __str__(self):
         return f'Inputs nodes  :  {self._input}\n' \
                f'Outputs nodes :  {self._output}\n' \
@@ -75,6 +88,18 @@ class NN:
         layers.append(self._output)
         return layers
 
+    @property
+    def bias(self) -> bool:
+        return self._bias
+
+    @property
+    def output_act(self) -> str:
+        return self._output_act.__name__
+
+    @property
+    def hidden_act(self) -> str:
+        return self._hidden_act.__name__
+
     @property
     def activations(self) -> dict[int, list[float]]:
         """
@@ -104,9 +129,10 @@ class NN:
         self._codification_info['length'] = length
         self._codification_info['slices'] = slices
 
-    def _dense_initialization(self) -> None:
+    def _dense_initialization(self, rng: np.random.Generator | None = None) -> None:
         """
         Produces a dense initialization of the NN
+        :param rng: random generator
         :return:
         """
         nodes = list([self._input, *self._hidden, self._output])
@@ -117,13 +143,13 @@ class NN:
         for i in range(len(nodes) - 1):
             # If output layer
             if i + 2 == len(nodes):
-                weights[f'{NN.W_NAME}{i}'] = self._output_init((nodes[i + 1], nodes[i]))
+                weights[f'{NN.W_NAME}{i}'] = self._output_init((nodes[i + 1], nodes[i]), rng)
             # If hidden layer
             else:
-                weights[f'{NN.W_NAME}{i}'] = self._hidden_init((nodes[i + 1], nodes[i]))
+                weights[f'{NN.W_NAME}{i}'] = self._hidden_init((nodes[i + 1], nodes[i]), rng)
             # Bias
             if self._bias:
-                bias[f'{NN.B_NAME}{i}'] = self._bias_init((nodes[i + 1], 1))
+                bias[f'{NN.B_NAME}{i}'] = self._bias_init((nodes[i + 1], 1), rng)
 
         self._w_matrices = weights
         self._bias_vec = bias
@@ -168,9 +194,12 @@ class NN:
 
     def encode(self) -> np.ndarray:
         """
-        Produces a 1D-array encoding of all weight and biases
+        Produces a 1D-array encoding of all weight and biases, a bound NN returns its codification array without
+        copying it
         :return:
         """
+        if self._code is not None:
+            return self._code
         encoding = np.empty(0)
         matrices = list(self._w_matrices.values())
         biases = list(self._bias_vec.values())
@@ -192,6 +221,11 @@ class NN:
         if len(nn_code) != length:
             raise ValueError(f"Wrong encoding array for this NN expected length={length}"
                              f".Found: 'len(nn_code)'={len(nn_code)}")
+        # A bound NN keeps its storage, the weights and biases are already views of it
+        if self._code is not None:
+            if not np.may_share_memory(nn_code, self._code):
+                self._code[:] = nn_code
+            return
 
         for i in range(len(old_w)):
             self._w_matrices[f'{NN.W_NAME}{i}'] = nn_code[slice_count:slice_count + slices[count]].reshape(old_w[i].shape)
@@ -201,3 +235,14 @@ class NN:
                 self._bias_vec[f'{NN.B_NAME}{i}'] = nn_code[slice_count:slice_count + slices[count]].reshape(old_b[i].shape)
                 slice_count += slices[count]
                 count += 1
+
+    def bind(self, nn_code: np.ndarray) -> None:
+        """
+        Uses an external 1D-array as storage of the weights and biases, which become views of it, so encode and
+        decode do not copy data anymore. Any change of the array is seen by the NN
+        :param nn_code: NN codification array, for example a row of a GenomeMatrix
+        :return:
+        """
+        self._code = None
+        self.decode(nn_code)
+        self._code = nn_code
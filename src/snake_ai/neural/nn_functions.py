@@ -52,15 +52,16 @@ class _Activation:
         return np.tanh(matrix)
 
     @staticmethod
-    def softmax(matrix: np.ndarray) -> np.ndarray:
+    def softmax(matrix: np.ndarray, axis: int | None = None) -> np.ndarray:
         """
         Softmax activation function
         :param matrix: matrix on which to apply softmax
+        :param axis: axis along which the softmax is applied, the whole matrix if None
         :return relu: a matrix with the same dimensions with the softmax function applied element wise
         """
-        shifted_matrix = matrix - np.max(matrix)
+        shifted_matrix = matrix - np.max(matrix, axis=axis, keepdims=True)
         exp = np.exp(shifted_matrix)
-        return exp / np.sum(exp)
+        return exp / np.sum(exp, axis=axis, keepdims=True)
 
 
 class _Initialization:
@@ -69,50 +70,54 @@ class _Initialization:
     """
 
     @staticmethod
-    def glorot(dimensions: tuple[int, int]) -> np.ndarray:
+    def glorot(dimensions: tuple[int, int], rng: np.random.Generator | None = None) -> np.ndarray:
         """
         Initializes a [1-2]-dimensional array with using Glorot's method
         :param dimensions: rows and columns of the [1-2]-dimensional array
+        :param rng: random generator, the global numpy random state is used if None
         :return: initialized matrix
         """
         if 0 < len(dimensions) < 3:
             if dimensions[0] > 0 and dimensions[1] > 0:
                 fan_in, fan_out = dimensions[0], dimensions[1]
                 stddev = math.sqrt(2.0 / (fan_in + fan_out))
-                return np.random.normal(loc=0.0, scale=stddev, size=dimensions)
+                return (np.random if rng is None else rng).normal(loc=0.0, scale=stddev, size=dimensions)
         return np.empty(0)
 
     @staticmethod
-    def he(dimensions: tuple[int, int]) -> np.ndarray:
+    def he(dimensions: tuple[int, int], rng: np.random.Generator | None = None) -> np.ndarray:
         """
         Initializes a [1-2]-dimensional array with using He's method
         :param dimensions: rows and columns of the [1-2]-dimensional array
+        :param rng: random generator, the global numpy random state is used if None
         :return: initialized matrix
         """
         if 0 < len(dimensions) < 3:
             if dimensions[0] > 0 and dimensions[1] > 0:
                 stddev = math.sqrt(2.0 / dimensions[0])
-                return np.random.normal(loc=0.0, scale=stddev, size=dimensions)
+                return (np.random if rng is None else rng).normal(loc=0.0, scale=stddev, size=dimensions)
         return np.empty(0)
 
     @staticmethod
-    def lecun(dimensions: tuple[int, int]) -> np.ndarray:
+    def lecun(dimensions: tuple[int, int], rng: np.random.Generator | None = None) -> np.ndarray:
         """
         Initializes a [1-2]-dimensional array with using LeCun's method
         :param dimensions: rows and columns of the [1-2]-dimensional array
+        :param rng: random generator, the global numpy random state is used if None
         :return: initialized matrix
         """
         if 0 < len(dimensions) < 3:
             if dimensions[0] > 0 and dimensions[1] > 0:
                 stddev = math.sqrt(1.0 / dimensions[0])
-                return np.random.normal(loc=0.0, scale=stddev, size=dimensions)
+                return (np.random if rng is None else rng).normal(loc=0.0, scale=stddev, size=dimensions)
         return np.empty(0)
 
     @staticmethod
-    def zero(dimensions: tuple[int, int]) -> np.ndarray:
+    def zero(dimensions: tuple[int, int], rng: np.random.Generator | None = None) -> np.ndarray:
         """
         Initializes a [1-2]-dimensional array with zero values
         :param dimensions: rows and columns of the [1-2]-dimensional array
+        :param rng: unused, the initialization is deterministic
         :return: initialized matrix
         """
         if 0 < len(dimensions) < 3:
@@ -0,0 +1,140 @@
+# This module contains the implementation of a neural network that evaluates all the brains of a population at once
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.neural.nn_functions import NNFunctionFactory
+from snake_ai.neural.nn import NN
+from inspect import signature
+import functools
+import numpy as np
+
+
+class PopulationNN:
+    """
+    This class holds the weights and biases of every individual of a population, sharing the same architecture,
+    stacked as (individuals, out, in) tensors, so a forward propagation of all of them is one matmul per layer
+    """
+    def __init__(self, input: int, output: int, hidden: list[int], bias: bool, output_act: str, hidden_act: str,
+                 genomes: np.ndarray, store_activations: bool = False):
+        """
+        Constructor
+        :param input: input nodes to the NN
+        :param output: output nodes from the NN
+        :param hidden: list with the number of nodes of each hidden layer
+        :param bias: flag to introduce or not bias vector
+        :param output_act: output layer activation function
+        :param hidden_act: hidden layers activation function
+        :param genomes: (individuals, length) array with the NN.encode() codification of each individual
+        :param store_activations: flag to keep the outputs of each layer after every forward propagation
+        """
+        func_factory = NNFunctionFactory()
+        self._input = input
+        self._output = output
+        self._hidden = hidden
+        self._bias = bias
+        self._output_act = PopulationNN._rowwise(func_factory.get_function('activation', output_act))
+        self._hidden_act = PopulationNN._rowwise(func_factory.get_function('activation', hidden_act))
+        self._store_activations = store_activations
+        self._activations: dict[int, np.ndarray] = {}
+        self._w_tensors: list[np.ndarray] = []
+        self._b_tensors: list[np.ndarray] = []
+        self.load(genomes)
+
+    @classmethod
+    def from_networks(cls, networks: list[NN], genomes: np.ndarray | None = None, store_activations: bool = False):
+        """
+        Creates a population NN from individual networks sharing the same architecture
+        :param networks: list of NN instances
+        :param genomes: codification matrix of the networks if it is already available, for example the array of the
+        GenomeMatrix the networks are bound to
+        :param store_activations: flag to keep the outputs of each layer after every forward propagation
+        :return: PopulationNN instance
+        """
+        layers = networks[0].layers
+        if genomes is None:
+            genomes = np.stack([network.encode() for network in networks])
+        return cls(input=layers[0], output=layers[-1], hidden=layers[1:-1], bias=networks[0].bias,
+                   output_act=networks[0].output_act, hidden_act=networks[0].hidden_act, genomes=genomes,
+                   store_activations=store_activations)
+
+    @staticmethod
+    def _rowwise(function):
+        """
+        Binds the activation functions that are not element wise to work over each row of a matrix
+        :param function: activation function
+        :return: activation function for (individuals, nodes) matrices
+        """
+        if 'axis' in signature(function).parameters:
+            return functools.partial(function, axis=1)
+        return function
+
+    @property
+    def individuals(self) -> int:
+        return self._individuals
+
+    @property
+    def layers(self) -> list[int]:
+        return [self._input, *self._hidden, self._output]
+
+    @property
+    def activations(self) -> dict[int, np.ndarray]:
+        """
+        Holds the last forward propagation outputs of each layer as (individuals, nodes) arrays, it is only filled if
+        the population was created to store them
+        :return:
+        """
+        return self._activations
+
+    def load(self, genomes: np.ndarray) -> None:
+        """
+        Sets the weights and biases of the population, the tensors are views of the genomes array when it is
+        contiguous, no data is copied
+        :param genomes: (individuals, length) array with the NN.encode() codification of each individual
+        :return:
+        """
+        nodes = self.layers
+        length = sum(nodes[i + 1] * nodes[i] + (nodes[i + 1] if self._bias else 0) for i in range(len(nodes) - 1))
+        if genomes.ndim != 2 or genomes.shape[1] != length:
+            raise ValueError(f"Wrong encoding matrix for this NN expected shape=(individuals, {length})"
+                             f".Found: {genomes.shape}")
+        self._individuals = genomes.shape[0]
+        self._w_tensors = []
+        self._b_tensors = []
+        start = 0
+        for i in range(len(nodes) - 1):
+            size = nodes[i + 1] * nodes[i]
+            self._w_tensors.append(genomes[:, start:start + size].reshape(-1, nodes[i + 1], nodes[i]))
+            start += size
+            if self._bias:
+                self._b_tensors.append(genomes[:, start:start + nodes[i + 1]])
+                start += nodes[i + 1]
+
+    def forward_prop(self, input: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        """
+        Forward propagation of several individuals at once
+        :param input: (individuals, input) array with one input row per individual
+        :param rows: indices of the individuals that receive the input rows, all of them if None
+        :return output: (individuals, output) array with the response of each individual
+        """
+        if input.ndim != 2 or input.shape[1] != self._input:
+            raise ValueError(f"No supported input to the NN. Supported inputs: (individuals, {self._input}) arrays")
+        # Gathering is only worth it when a part of the population is evaluated
+        if rows is not None and len(rows) == self._individuals:
+            rows = None
+        activations = {}
+        output = input
+        for i in range(len(self._w_tensors)):
+            weights = self._w_tensors[i] if rows is None else self._w_tensors[i][rows]
+            output = np.matmul(weights, output[:, :, None])[:, :, 0]
+            if self._bias:
+                output = output + (self._b_tensors[i] if rows is None else self._b_tensors[i][rows])
+            if i == len(self._w_tensors) - 1:
+                output = self._output_act(output)
+            else:
+                output = self._hidden_act(output)
+            if self._store_activations:
+                activations[i] = output
+        self._activations = activations
+        return output
@@ -0,0 +1,115 @@
+# This module contains the class that keeps a set of processes evaluating individuals on demand
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.snake.game_process.snake_ai_process import SnakeAI
+from snake_ai.genetic.genome_matrix import GenomeMatrix
+from snake_ai.data import StatsTable
+from multiprocessing import Process, Queue
+from queue import Empty
+import numpy as np
+import random
+
+
+class AsyncSnakePool:
+    """
+    Long-lived processes that evaluate individuals on demand. Every process holds all the individuals of a batch, their
+    NN read the codifications from the shared genome matrix, and pulls the run orders from a common queue, so an idle
+    process takes the next pending individual without waiting for the rest to finish their games
+    """
+    def __init__(self, individuals: dict[int, SnakeAI], processes: int, genomes: GenomeMatrix):
+        """
+        Constructor
+        :param individuals: individuals of the batch by id
+        :param processes: number of processes
+        :param genomes: genome matrix of the batch, row i holds the individual with the i-th id
+        """
+        rows = {id: row for row, id in enumerate(individuals.keys())}
+        self._orders = Queue()
+        self._results = Queue()
+        self._pending = 0
+        self._processes: list[Process] = []
+        for _ in range(processes):
+            process = Process(target=AsyncSnakePool._serve,
+                              args=(self._orders, self._results, individuals, rows, genomes),
+                              daemon=True)
+            process.start()
+            self._processes.append(process)
+
+    @staticmethod
+    def _serve(orders: Queue, results: Queue, individuals: dict[int, SnakeAI], rows: dict[int, int],
+               genomes: GenomeMatrix) -> None:
+        """
+        Process loop, pulls run orders with the generation number and the id of an individual, runs its game and puts
+        back the stats in columnar form, it ends when None is received
+        :param orders: queue of run orders shared by all the processes
+        :param results: queue where the stats are put
+        :param individuals: individuals of the batch by id
+        :param rows: genome matrix row of each individual
+        :param genomes: genome matrix attached by this process
+        :return:
+        """
+        # Forked processes inherit the same random state, every process must place its own apples unless the
+        # individuals are seeded
+        random.seed()
+        for id, individual in individuals.items():
+            individual.controller.brain.bind(genomes.row(rows[id]))
+        while (order := orders.get()) is not None:
+            generation, id = order
+            individuals[id].reset(generation)
+            results.put(StatsTable.from_results([individuals[id].simulate()]))
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of individuals submitted whose stats have not been collected yet
+        :return:
+        """
+        return self._pending
+
+    def submit(self, generation: int, id: int) -> None:
+        """
+        Orders the evaluation of an individual with the current content of its genome matrix row, the row must not be
+        modified until its stats are collected
+        :param generation: generation number, it selects the random stream of seeded individuals
+        :param id: individual id
+        :return:
+        """
+        self._orders.put((generation, id))
+        self._pending += 1
+
+    def collect(self, timeout: float | None = None) -> np.ndarray:
+        """
+        Waits for the next evaluation to finish, in completion order
+        :param timeout: maximum seconds to wait, forever if None
+        :return stats: structured array with the performance stats of the individual in one row, see StatsTable
+        """
+        stats = self._results.get(timeout=timeout)
+        self._pending -= 1
+        return stats
+
+    def close(self) -> None:
+        """
+        Stops all the processes of the pool, the pending evaluations are discarded
+        :return:
+        """
+        # The orders that no process has taken yet are dropped
+        try:
+            while True:
+                self._orders.get_nowait()
+        except Empty:
+            pass
+        for _ in self._processes:
+            self._orders.put(None)
+        # The results still in the queue must be read, otherwise the processes cannot end
+        while any(process.is_alive() for process in self._processes):
+            try:
+                self._results.get(timeout=0.1)
+            except Empty:
+                pass
+        for process in self._processes:
+            process.join()
+        self._processes.clear()
+        self._pending = 0
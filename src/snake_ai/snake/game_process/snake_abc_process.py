@@ -7,17 +7,16 @@
 
 from abc import abstractmethod, ABC
 from snake_ai.snake.snake_core.snake_core import SnakeCore
-from snake_ai.snake.snake_core.snake_gui_core import SnakeGUI
 from snake_ai.snake.snake_controller import GameController
 
 
 class SnakeProcess(ABC):
 
-    def __init__(self, size: tuple[int, int], core: SnakeCore | SnakeGUI, controller: GameController):
+    def __init__(self, size: tuple[int, int], core: SnakeCore, controller: GameController):
         """
         Constructor
         :param size: game grid size
-        :param core: object instance of a SnakeCore like implementation
+        :param core: object instance of a SnakeCore like implementation, SnakeGUI implementations included
         :param controller: object instance of a GameController like implementation
         """
         self._core = core
@@ -8,6 +8,8 @@
 from snake_ai.snake.game_process.snake_abc_process import SnakeProcess
 from snake_ai.snake.snake_core.snake_core import SnakeCore
 from snake_ai.snake.snake_controller import AIController
+import numpy as np
+import copy
 
 
 class SnakeAI(SnakeProcess):
@@ -19,7 +21,7 @@ class SnakeAI(SnakeProcess):
 
     def __init__(self, size: tuple[int, int], input: int, output: int, hidden: list[int], vision: str,
                  output_init: str, bias: bool, hidden_init: str, output_act: str, hidden_act: str,
-                 bias_init: str = 'zero'):
+                 bias_init: str = 'zero', cmp_mode: str = 'eager', seed: int | None = None):
         """
         Constructor
         :param size: game grid size
@@ -32,19 +34,54 @@ class SnakeAI(SnakeProcess):
         :param hidden_init: hidden layers initialization method to be used
         :param output_act: output layer activation function
         :param hidden_act: hidden layers activation function
+        :param cmp_mode: when the min paths of the efficiency are calculated, see SnakeCore
+        :param seed: seed of the random streams of the individual, the global random states are used if None
         """
+        self._id = SnakeAI.obj_counter
+        SnakeAI.obj_counter += 1
+        self._seed = seed
+        rng = None if seed is None else SnakeAI.game_rng(seed, 0, self._id)
         self._controller = AIController(input=input, output=output, hidden=hidden, output_init=output_init, bias=bias,
                                         bias_init=bias_init, hidden_init=hidden_init, output_act=output_act,
-                                        hidden_act=hidden_act)
-        SnakeProcess.__init__(self, size=size, core=SnakeCore(size=size, mode='autoT', vision=vision),
+                                        hidden_act=hidden_act, rng=rng)
+        self._core_params = {'size': size, 'mode': 'autoT', 'vision': vision, 'cmp_mode': cmp_mode}
+        SnakeProcess.__init__(self, size=size, core=SnakeCore(**self._core_params, rng=rng),
                               controller=self._controller)
-        self._id = SnakeAI.obj_counter
-        SnakeAI.obj_counter += 1
+        self._initial_core = copy.deepcopy(self._core)
 
     @classmethod
     def reset_obj_counter(cls):
         SnakeAI.obj_counter = 1
 
+    @staticmethod
+    def game_rng(seed: int, generation: int, id: int, episode: int = 0) -> np.random.Generator:
+        """
+        Produces the random stream of an individual in an episode of a generation, every combination has its own
+        independent stream. Generation 0 is the one used to initialize the individual
+        :param seed: seed of the training
+        :param generation: generation number
+        :param id: individual identifier
+        :param episode: episode number within the generation
+        :return: random generator
+        """
+        key = (generation, id) if episode == 0 else (generation, id, episode)
+        return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=key))
+
+    def reset(self, generation: int | None = None, episode: int = 0) -> None:
+        """
+        Restores the game to its initial state, so the same individual can be simulated again. A seeded individual
+        plays a new game drawn from the stream of the given generation and episode
+        :param generation: generation number, only used by seeded individuals
+        :param episode: episode number within the generation, only used by seeded individuals
+        :return:
+        """
+        if self._seed is None or generation is None:
+            self._core = copy.deepcopy(self._initial_core)
+        else:
+            self._core = SnakeCore(**self._core_params,
+                                   rng=SnakeAI.game_rng(self._seed, generation, self._id, episode))
+        self._running = self._core.alive
+
     @property
     def vision(self):
         return self._core.vision_type
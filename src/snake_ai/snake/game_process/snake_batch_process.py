@@ -5,26 +5,88 @@
 # Version: 0.0.1
 
 from snake_ai.snake.game_process.snake_ai_process import SnakeAI
-from snake_ai.data import Population
-import multiprocessing
+from snake_ai.snake.game_process.snake_pool import SnakePool
+from snake_ai.snake.game_process.async_snake_pool import AsyncSnakePool
+from snake_ai.snake.snake_core import BatchedSnakeCore
+from snake_ai.snake.snake_controller import AIController
+from snake_ai.neural.population_nn import PopulationNN
+from snake_ai.genetic.genome_matrix import GenomeMatrix
+from snake_ai.data import Population, StatsTable
 import numpy as np
+import hashlib
+import math
 
 
 class SnakeBatch:
     """This class is intended to create, maintain and run several Snake base AI controlled processes"""
 
+    # Class constants
+    ENGINES = {'pool', 'batched'}
+
     def __init__(self, individuals: int, cpu_cores: int, size: tuple[int, int], input: int, vision: str,
                  output: int, hidden: list[int], output_init: str, bias: bool, hidden_init: str,
-                 output_act: str, hidden_act: str, bias_init: str = 'zero'):
+                 output_act: str, hidden_act: str, bias_init: str = 'zero', engine: str = 'pool',
+                 cmp_mode: str = 'eager', seed: int | None = None, reevaluate: bool = False, episodes: int = 1,
+                 halving: int = 2):
+        """
+        Constructor
+        :param individuals: number of individuals in the batch
+        :param cpu_cores: number of processes used by the 'pool' engine
+        :param size: game grid size
+        :param input: input nodes to the NN
+        :param vision: type of vision identifier
+        :param output: output nodes from the NN
+        :param hidden: list with the number of nodes of each hidden layer
+        :param output_init: output layer weights initialization method to be used
+        :param bias: flag to introduce or not bias vector
+        :param hidden_init: hidden layers initialization method to be used
+        :param output_act: output layer activation function
+        :param hidden_act: hidden layers activation function
+        :param bias_init: bias initialization method to be used
+        :param engine: 'pool' runs the games in a pool of processes that lives as long as the batch, 'batched' runs
+        all of them as a BatchedSnakeCore
+        :param cmp_mode: when the min paths of the efficiency are calculated by the 'pool' engine, see SnakeCore
+        :param seed: seed of the whole batch, every individual gets its own random stream for its initialization and
+        for the game of each generation, see SnakeAI.game_rng. Both engines play the same games with the same seed.
+        The global random states are used if None
+        :param reevaluate: flag to simulate every individual at every run, otherwise the stats of the genomes that
+        were already evaluated are reused and just the new or modified ones are simulated
+        :param episodes: maximum number of episodes an individual plays in a run, the stats are averaged over them
+        :param halving: fraction of the contenders, as 1 / halving, that keeps playing after each round of episodes,
+        see SnakeBatch._evaluate
+        """
+        if engine not in SnakeBatch.ENGINES:
+            raise ValueError(f"Engine {engine} not supported. Supported engines {SnakeBatch.ENGINES}")
+        if episodes < 1 or halving < 2:
+            raise ValueError(f"At least one episode and a halving of two are required. Found: episodes={episodes}, "
+                             f"halving={halving}")
         SnakeAI.reset_obj_counter()
         self._processes: dict[int, SnakeAI] = {SnakeAI.obj_counter:
                                                SnakeAI(size=size, input=input, output=output, hidden=hidden, bias=bias,
                                                        bias_init=bias_init, output_init=output_init,
                                                        hidden_init=hidden_init, output_act=output_act,
-                                                       hidden_act=hidden_act, vision=vision)
+                                                       hidden_act=hidden_act, vision=vision, cmp_mode=cmp_mode,
+                                                       seed=seed)
                                                for _ in range(individuals)}
+        # All the NN use the rows of a shared matrix as storage
+        self._genomes = GenomeMatrix(individuals, len(self._processes[1].controller.nn_code))
+        for row, individual in enumerate(self._processes.values()):
+            self._genomes.array[row] = individual.controller.nn_code
+        self._bind_brains()
         self._cpu_cores = cpu_cores
-        self.results = {}
+        self._engine = engine
+        self._seed = seed
+        self._generation = 0
+        self._reevaluate = reevaluate
+        self._episodes = episodes
+        self._halving = halving
+        # Row of the last results where each genome was evaluated, by genome hash
+        self._evaluated: dict[bytes, int] = {}
+        self._pool: SnakePool | None = None
+        self._async_pool: AsyncSnakePool | None = None
+        self._size = size
+        self._vision = vision
+        self.results = np.zeros(0, dtype=StatsTable.dtype)
         self._pop_dat = Population()
         self._population = {
             self._pop_dat.vision[0]: vision,
@@ -38,29 +100,178 @@ class SnakeBatch:
             self._pop_dat.population[0]: self.get_population_brains()
         }
 
+    @property
+    def genomes(self) -> GenomeMatrix:
+        """
+        Codification of the whole population, row i holds the individual with the i-th id
+        :return:
+        """
+        return self._genomes
+
+    @property
+    def cpu_cores(self) -> int:
+        return self._cpu_cores
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of individuals submitted for asynchronous evaluation whose stats have not been collected yet
+        :return:
+        """
+        return 0 if self._async_pool is None else self._async_pool.pending
+
     @property
     def population(self):
         self._population['population'] = self.get_population_brains()
         return self._population
 
-    def _run(self, individual: SnakeAI) -> tuple[int, dict[str, float]]:
+    def __getstate__(self) -> dict:
+        # The pool processes belong to the process that created them
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        state['_async_pool'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._bind_brains()
+
+    def _bind_brains(self) -> None:
+        """
+        Makes every NN use its row of the genome matrix as storage
+        :return:
+        """
+        for row, individual in enumerate(self._processes.values()):
+            individual.controller.brain.bind(self._genomes.row(row))
+
+    @staticmethod
+    def _genome_key(genome: np.ndarray) -> bytes:
         """
-        Calls an individual execution
-        :param individual: individual to be executed
-        :return stats: id of the individual and a dict containing the performance stats
+        Produces the key that identifies a genome in the evaluation cache
+        :param genome: codification of an individual
+        :return: digest of the codification
         """
-        return individual.simulate()
+        return hashlib.blake2b(genome.tobytes(), digest_size=16).digest()
+
+    def _run_batched(self, ids: list[int], episode: int) -> np.ndarray:
+        """
+        Runs the individuals games at once with a BatchedSnakeCore, at every step the live snakes choose their
+        actions with a single forward propagation of the population brains
+        :param ids: ascending ids of the individuals to be run
+        :param episode: episode number within the current generation
+        :return stats: structured array with the performance stats of each individual run, see StatsTable
+        """
+        brains = PopulationNN.from_networks([self._processes[id].controller.brain for id in ids],
+                                            genomes=self._genomes.array[np.array(ids) - 1])
+        rngs = None if self._seed is None else [SnakeAI.game_rng(self._seed, self._generation, id, episode)
+                                                for id in ids]
+        core = BatchedSnakeCore(size=self._size, games=len(ids), vision=self._vision, rngs=rngs)
+        directions = core.directions.copy()
+        while core.running:
+            live = core.live
+            directions[live] = AIController.population_action(brains, core.directions[live], core.vision[live], live)
+            core.next_state(directions)
+        return core.stats_table(ids)
+
+    def _run_episode(self, ids: list[int], episode: int) -> np.ndarray:
+        """
+        Runs an episode of the individuals with the engine of the batch
+        :param ids: ascending ids of the individuals to be run
+        :param episode: episode number within the current generation
+        :return stats: structured array with the performance stats of each individual run, see StatsTable
+        """
+        if self._engine == 'batched':
+            return self._run_batched(ids, episode)
+        # The pool is created by the first run, so it belongs to the process that is training
+        if self._pool is None:
+            self._pool = SnakePool(individuals=self._processes, processes=self._cpu_cores, genomes=self._genomes)
+        return self._pool.run(self._generation, ids, episode)
+
+    def _evaluate(self, ids: list[int]) -> np.ndarray:
+        """
+        Evaluates the individuals by successive halving. Everyone plays a first episode, then after every round just
+        the best 1 / halving of the contenders keep playing, until they have played halving times the episodes of the
+        previous round or the episodes of the batch. Each individual gets the average stats of the episodes it played
+        :param ids: ascending ids of the individuals to be evaluated
+        :return stats: structured array with the performance stats of each individual, see StatsTable
+        """
+        results = self._run_episode(ids, 0)
+        contenders = np.arange(len(ids))
+        played = 1
+        while played < self._episodes and len(contenders) > 1:
+            # The contenders have played the same episodes, they are ranked by total score and then by total moves
+            order = np.lexsort((results['moves'][contenders], results['score'][contenders]))
+            contenders = np.sort(contenders[order[-math.ceil(len(contenders) / self._halving):]])
+            target = min(played * self._halving, self._episodes)
+            for episode in range(played, target):
+                episode_results = self._run_episode([ids[i] for i in contenders], episode)
+                for name in StatsTable.stats[1:]:
+                    results[name][contenders] += episode_results[name]
+                results['episodes'][contenders] += 1
+            played = target
+        for name in StatsTable.stats[1:]:
+            results[name] /= results['episodes']
+        return results
 
     def run(self) -> None:
         """
-        Runs all the individual and collects all the performance results
+        Runs the individuals and collects all the performance results as a structured array in id order, see
+        StatsTable. Unless the batch reevaluates, the individuals whose genome was already evaluated in the previous
+        run, or that is a copy of one of them, are not simulated again and keep those stats. The rest are evaluated
+        over several episodes if the batch is configured to, see SnakeBatch._evaluate
         :return:
         """
-        pool = multiprocessing.Pool(processes=self._cpu_cores)
-        results = pool.map(self._run, [process for process in list(self._processes.values())])
-        pool.close()
-        pool.join()
+        self._generation += 1
+        keys = [SnakeBatch._genome_key(genome) for genome in self._genomes.array]
+        sources = np.full(len(keys), -1)
+        if not self._reevaluate:
+            sources = np.array([self._evaluated.get(key, -1) for key in keys])
+        results = np.zeros(len(keys), dtype=StatsTable.dtype)
+        cached = sources >= 0
+        results[cached] = self.results[sources[cached]]
+        results['id'] = list(self._processes.keys())
+        pending = np.flatnonzero(~cached)
+        if len(pending) > 0:
+            results[pending] = self._evaluate(results['id'][pending].tolist())
         self.results = results
+        self._evaluated = {key: row for row, key in enumerate(keys)}
+
+    def submit(self, ids: list[int]) -> None:
+        """
+        Orders the asynchronous evaluation of some individuals by a pool whose processes take them as soon as they are
+        idle, the stats are obtained with SnakeBatch.collect. The genomes of the individuals must not be modified until
+        their stats are collected. Every call draws new games for seeded individuals, the evaluation cache and the
+        episodes of the batch are not used
+        :param ids: ids of the individuals to be evaluated
+        :return:
+        """
+        # The pool is created by the first submission, so it belongs to the process that is training
+        if self._async_pool is None:
+            self._async_pool = AsyncSnakePool(individuals=self._processes, processes=self._cpu_cores,
+                                              genomes=self._genomes)
+        self._generation += 1
+        for id in ids:
+            self._async_pool.submit(self._generation, id)
+
+    def collect(self, timeout: float | None = None) -> np.ndarray:
+        """
+        Waits for the next submitted individual to finish its game
+        :param timeout: maximum seconds to wait, forever if None
+        :return stats: structured array with the performance stats of the individual in one row, see StatsTable
+        """
+        return self._async_pool.collect(timeout)
+
+    def close(self) -> None:
+        """
+        Releases the processes used by the batch, a later run creates them again
+        :return:
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        if self._async_pool is not None:
+            self._async_pool.close()
+            self._async_pool = None
 
     def get_individual(self, identifier: int) -> dict:
         """
@@ -72,7 +283,8 @@ class SnakeBatch:
 
     def get_population_brains(self) -> dict[int, np.ndarray]:
         """
-        Produces a dictionary with the id and the codification of each individual
+        Produces a dictionary with the id and the codification of each individual, the codifications are views of
+        the genome matrix rows
         :return population: the dictionary just described
         """
         population: dict[int, np.ndarray] = {}
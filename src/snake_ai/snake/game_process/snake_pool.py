@@ -0,0 +1,99 @@
+# This module contains the class that keeps a set of processes alive to run the games of a batch along generations
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.snake.game_process.snake_ai_process import SnakeAI
+from snake_ai.genetic.genome_matrix import GenomeMatrix
+from snake_ai.data import StatsTable
+from multiprocessing.connection import Connection
+from multiprocessing import Process, Pipe
+import numpy as np
+import random
+
+
+class SnakePool:
+    """
+    Long-lived processes, each one owning a fixed shard of the individuals of a batch. The individuals are sent once
+    when the pool is created, their NN read the codifications from the shared genome matrix, so every generation
+    just a run order travels to the processes and just the stats travel back
+    """
+    def __init__(self, individuals: dict[int, SnakeAI], processes: int, genomes: GenomeMatrix):
+        """
+        Constructor
+        :param individuals: individuals of the batch by id
+        :param processes: number of processes
+        :param genomes: genome matrix of the batch, row i holds the individual with the i-th id
+        """
+        ids = list(individuals.keys())
+        rows = {id: row for row, id in enumerate(ids)}
+        self._shards: list[list[int]] = [list(shard) for shard in np.array_split(ids, min(processes, len(ids)))]
+        self._connections: list[Connection] = []
+        self._processes: list[Process] = []
+        for shard in self._shards:
+            parent_conn, child_conn = Pipe()
+            process = Process(target=SnakePool._serve,
+                              args=(child_conn, {id: individuals[id] for id in shard}, {id: rows[id] for id in shard},
+                                    genomes),
+                              daemon=True)
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    @staticmethod
+    def _serve(connection: Connection, individuals: dict[int, SnakeAI], rows: dict[int, int],
+               genomes: GenomeMatrix) -> None:
+        """
+        Process loop, waits for a run order with the generation and episode numbers and the ids to be run, runs their
+        games and sends back the stats in columnar form, it ends when None is received
+        :param connection: pipe end to communicate with the pool
+        :param individuals: shard of individuals owned by the process
+        :param rows: genome matrix row of each individual
+        :param genomes: genome matrix attached by this process
+        :return:
+        """
+        # Forked processes inherit the same random state, every shard must place its own apples unless the
+        # individuals are seeded
+        random.seed()
+        for id, individual in individuals.items():
+            individual.controller.brain.bind(genomes.row(rows[id]))
+        while (order := connection.recv()) is not None:
+            generation, episode, ids = order
+            results = []
+            for id in ids:
+                individuals[id].reset(generation, episode)
+                results.append(individuals[id].simulate())
+            connection.send(StatsTable.from_results(results))
+        connection.close()
+
+    def run(self, generation: int, ids: list[int] | None = None, episode: int = 0) -> np.ndarray:
+        """
+        Runs an episode of a generation over all the shards with the current content of the genome matrix
+        :param generation: generation number, it selects the random streams of seeded individuals
+        :param ids: ascending ids of the individuals to be run, all of them if None
+        :param episode: episode number within the generation, it selects the random streams of seeded individuals
+        :return stats: structured array with the performance stats of each individual run in id order, see StatsTable
+        """
+        selected = None if ids is None else set(ids)
+        for shard, connection in zip(self._shards, self._connections):
+            shard = shard if selected is None else [id for id in shard if id in selected]
+            connection.send((generation, episode, shard))
+        return np.concatenate([connection.recv() for connection in self._connections])
+
+    def close(self) -> None:
+        """
+        Stops all the processes of the pool
+        :return:
+        """
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections.clear()
+        self._processes.clear()
@@ -8,16 +8,23 @@ from snake_ai.snake.snake_controller.controller_abc import GameController
 from snake_ai.snake.enums import GameDirection, NNOutput
 import numpy as np
 from snake_ai.neural.nn import NN
+from snake_ai.neural.population_nn import PopulationNN
 
 
 class AIController(GameController):
     """
     Implements an auto-controller for the snake
     """
+
+    # Class constants
+    # Direction code increment for each NN output [left, straight, right] over the clock wise directions
+    TURNS = np.array([1, 0, -1])
+
     def __init__(self, input: int, output: int, hidden: list[int], output_init: str, bias: bool, bias_init: str,
-                 hidden_init: str, output_act: str, hidden_act: str):
+                 hidden_init: str, output_act: str, hidden_act: str, rng: np.random.Generator | None = None):
         self._nn = NN(input=input, output=output, hidden=hidden, output_init=output_init, bias=bias,
-                      bias_init=bias_init, hidden_init=hidden_init, output_act=output_act, hidden_act=hidden_act)
+                      bias_init=bias_init, hidden_init=hidden_init, output_act=output_act, hidden_act=hidden_act,
+                      rng=rng)
 
     @property
     def nn_code(self) -> np.ndarray:
@@ -88,3 +95,26 @@ class AIController(GameController):
         else:
             next_dir = current_dir
         return next_dir
+
+    @staticmethod
+    def decide(current_dirs: np.ndarray, outputs: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of the action method, it translates the NN outputs of several snakes to directions
+        :param current_dirs: current direction codes as the clock wise index used by BatchedSnakeCore
+        :param outputs: (snakes, 3) array with the NN outputs
+        :return: array with the next direction codes
+        """
+        return (current_dirs + AIController.TURNS[np.argmax(outputs, axis=1)]) % 4
+
+    @staticmethod
+    def population_action(brains: PopulationNN, current_dirs: np.ndarray, vision: np.ndarray,
+                          rows: np.ndarray | None = None) -> np.ndarray:
+        """
+        Produces the next direction of several snakes with a single forward propagation of their brains
+        :param brains: brains of the whole population
+        :param current_dirs: current direction codes of the snakes
+        :param vision: (snakes, input) array with the vision of each snake
+        :param rows: indices of the snakes inside the population, all of them if None
+        :return: array with the next direction codes
+        """
+        return AIController.decide(current_dirs, brains.forward_prop(vision, rows))
@@ -7,8 +7,6 @@
 from snake_ai.snake.snake_controller.controller_abc import GameController
 from snake_ai.snake.enums import GameDirection
 import contextlib
-with contextlib.redirect_stdout(None):
-    import pygame
 
 
 class HumanController(GameController):
@@ -23,6 +21,10 @@ class HumanController(GameController):
         :param events: registered keyboard events within a loop
         :return direction: the new direction to take
         """
+        # pygame is imported when a human plays, the package imports this module and the headless training must
+        # not depend on it
+        with contextlib.redirect_stdout(None):
+            import pygame
         keys = [pygame.K_RIGHT, pygame.K_LEFT, pygame.K_UP, pygame.K_DOWN]
         key: pygame.constants = None
         direction = current_dir
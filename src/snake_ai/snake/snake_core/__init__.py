@@ -1,3 +1 @@
-
-
-
+from .batched_snake_core import BatchedSnakeCore
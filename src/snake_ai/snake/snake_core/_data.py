@@ -6,12 +6,21 @@
 
 from dataclasses import dataclass
 from snake_ai.snake.enums import GameDirection
+from array import array
 
 
 class Node:
     """
-    This class represent the minimal unit(block) that forms the Snake
+    This class represent the minimal unit(block) that forms the Snake. The directions are stored as the index of
+    the GameDirection in Node.DIRECTIONS, the dir property translates them
     """
+    # Class constants
+    DIRECTIONS = (GameDirection.UP, GameDirection.LEFT, GameDirection.DOWN, GameDirection.RIGHT, GameDirection.NONE)
+    CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+    NONE = 4
+
+    __slots__ = ('row', 'col', 'move_dir', 'turn_dir', 'prev', 'next')
+
     def __init__(self, row: int, column: int, direction: GameDirection, previous=None, next=None):
         """
         Constructor
@@ -23,7 +32,8 @@ class Node:
         """
         self.row = row
         self.col = column
-        self._dir = [direction, GameDirection.NONE]
+        self.move_dir = Node.CODES[direction]
+        self.turn_dir = Node.NONE
         self.prev = previous
         self.next = next
 
@@ -37,12 +47,32 @@ class Node:
         return f'[({self.row},{self.col}) : {self.dir}] --> '
 
     @property
-    def dir(self):
-        return self._dir
+    def dir(self) -> tuple[GameDirection, GameDirection]:
+        """
+        Direction where the block is moving and direction taken by the next block if it turned
+        :return:
+        """
+        return Node.DIRECTIONS[self.move_dir], Node.DIRECTIONS[self.turn_dir]
 
     @dir.setter
     def dir(self, new_dir: tuple[GameDirection, GameDirection]) -> None:
-        self._dir = [new_dir[0], new_dir[1]]
+        self.move_dir = Node.CODES[new_dir[0]]
+        self.turn_dir = Node.CODES[new_dir[1]]
+
+    def reuse(self, row: int, column: int, move_dir: int) -> None:
+        """
+        Turns a detached node into a new one, so nodes can be recycled instead of allocated
+        :param row: row that occupied in the grid matrix
+        :param column: column that occupied in the grid matrix
+        :param move_dir: code of the direction where is moving the block
+        :return:
+        """
+        self.row = row
+        self.col = column
+        self.move_dir = move_dir
+        self.turn_dir = Node.NONE
+        self.prev = None
+        self.next = None
 
     def pos(self) -> tuple[int, int]:
         """
@@ -54,13 +84,28 @@ class Node:
 
 class BlockLinkedList:
     """
-    This class represents and holds the entire snake body information within the grid matrix
+    This class represents and holds the entire snake body information within the grid matrix.
+    Besides the linked nodes, the cells of the body without the head are kept in a ring buffer of flat cell indices
+    with an occupancy map, so adding, popping and checking a cell cost O(1)
     """
-    def __init__(self):
+    def __init__(self, rows: int, cols: int):
+        """
+        Constructor
+        :param rows: number of rows in the grid
+        :param cols: number of columns in the grid
+        """
         self.head: Node | None = None
         self.tail: Node | None = None
-        self.body_map: list[tuple[int, int]] = []
         self.length: int = 0
+        self._cols = cols
+        self._capacity = rows * cols
+        self._body = array('H', bytes(2 * self._capacity))
+        self._occupancy = bytearray(self._capacity)
+        # Next slot to write the neck and slot of the tail in the ring buffer
+        self._front = 0
+        self._back = 0
+        # Last popped tail, it becomes the next head
+        self._spare: Node | None = None
 
     def __str__(self) -> str:
         if self.length != 0:
@@ -83,18 +128,26 @@ class BlockLinkedList:
         :param direction: direction in which the block is moving
         :return:
         """
-        new_head = Node(row=position[0], column=position[1], direction=direction)
+        if self._spare is None:
+            new_head = Node(row=position[0], column=position[1], direction=direction)
+        else:
+            new_head = self._spare
+            new_head.reuse(position[0], position[1], Node.CODES[direction])
+            self._spare = None
         if self.length == 0:
             self.tail = new_head
             self.head = new_head
         else:
-            self.body_map.insert(0, (self.head.row, self.head.col))
+            cell = self.head.row * self._cols + self.head.col
+            self._body[self._front] = cell
+            self._occupancy[cell] = 1
+            self._front = (self._front + 1) % self._capacity
             new_head.prev = self.head
             self.head.next = new_head
             self.head = new_head
             # Update neck direction
-            if self.head.dir != self.head.prev.dir:
-                self.head.prev.dir[1] = self.head.dir[0]
+            if self.head.move_dir != self.head.prev.move_dir:
+                self.head.prev.turn_dir = self.head.move_dir
         self.length += 1
 
     def pop(self) -> None:
@@ -105,11 +158,23 @@ class BlockLinkedList:
         # Update tail position and direction
         current = self.tail.next
         current.prev = None
+        self._spare = self.tail
+        self._spare.next = None
         self.tail = current
-        current.dir = (current.next.dir[0], GameDirection.NONE)
-        self.body_map.pop()
+        current.move_dir = current.next.move_dir
+        current.turn_dir = Node.NONE
+        self._occupancy[self._body[self._back]] = 0
+        self._back = (self._back + 1) % self._capacity
         self.length -= 1
 
+    def occupied(self, position: tuple[int, int]) -> bool:
+        """
+        Checks if a cell of the grid is occupied by the body, the head excluded
+        :param position: cell to check
+        :return bool:
+        """
+        return self._occupancy[position[0] * self._cols + position[1]] == 1
+
 
 @dataclass
 class StatsStruct:
@@ -0,0 +1,384 @@
+# This module is intended to contain the class that runs several Snake games at once as numpy arrays
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.snake.enums import GameDirection, GridDict, NNDirection
+from snake_ai.data import StatsTable
+import numpy as np
+import random
+import math
+
+
+class BatchedSnakeCore:
+    """
+    Holds the state of N auto-controlled games as arrays and advances every live game with a single vectorized step.
+    It follows exactly the same rules as SnakeCore, so the same controller and the same random sequence produce the
+    same stats
+    """
+
+    # Class constants
+    MODES = {'autoT', 'autoP'}
+    # Clock wise turning direction, the index of each direction is its code inside the engine
+    CLK_DIRS = (GameDirection.UP, GameDirection.LEFT, GameDirection.DOWN, GameDirection.RIGHT)
+    # Row and column increments for each direction code
+    STEPS = np.array([[-1, 0], [0, -1], [1, 0], [0, 1]])
+    # NN encoding for each direction code
+    NN_DIRS = np.array([NNDirection[direction.name].value for direction in CLK_DIRS], dtype=float)
+
+    def __init__(self, size: tuple[int, int], games: int, vision: str, mode: str = 'autoT',
+                 rngs: list[np.random.Generator] | None = None):
+        """
+        Constructor
+        :param size: grid size
+        :param games: number of games to run simultaneously
+        :param vision: type of vision identifier
+        :param mode: auto mode used to set the moves limit of the games
+        :param rngs: random generator of each game used to place the apples, the global random state is used if None.
+        A game draws the same numbers as a SnakeCore with the same generator
+        """
+        if size[0] < 10 or size[1] < 10:
+            raise ValueError("Minimum grid size supported (10 , 10)")
+        if mode not in BatchedSnakeCore.MODES:
+            raise ValueError(f"Mode {mode} not supported. Supported modes {BatchedSnakeCore.MODES}")
+        if vision not in ['binary', 'real']:
+            raise ValueError(f'vision type: "{vision}" not supported')
+        if rngs is not None and len(rngs) != games:
+            raise ValueError(f"One random generator per game is needed. Found {len(rngs)} for {games} games")
+        self._rngs = rngs
+        self._vision_type = vision
+        self._mode = mode
+        self._games = games
+        self._rows = size[0]
+        self._cols = size[1]
+        self._cells = self._rows * self._cols
+        # Ring buffer capacity, one extra slot for the head added in the move that kills the snake
+        self._capacity = self._cells + 1
+        self._apple_limit = math.ceil(self._cells * 1.5)
+        self._max_score = self._cells - 3
+        # Grids are stored flat with an extra always empty cell used as sentinel for out of grid positions
+        self._grid = np.zeros((games, self._cells + 1), dtype=np.int8)
+        self._body = np.zeros((games, self._capacity), dtype=np.int32)
+        self._head_ptr = np.zeros(games, dtype=np.int32)
+        self._tail_ptr = np.zeros(games, dtype=np.int32)
+        self._length = np.zeros(games, dtype=np.int32)
+        self._head = np.zeros(games, dtype=np.int32)
+        self._dir = np.zeros(games, dtype=np.int8)
+        self._apple = np.full(games, -1, dtype=np.int32)
+        self._running = np.ones(games, dtype=bool)
+        self._completed = np.zeros(games, dtype=bool)
+        self._moves_limit = np.zeros(games, dtype=np.int64)
+        self._vision = np.zeros((games, 22))
+        self._rays = self._ray_table() if vision == 'real' else None
+        # Stats
+        self._score = np.zeros(games, dtype=np.int64)
+        self._total_moves = np.zeros(games, dtype=np.int64)
+        self._moves = np.zeros(games, dtype=np.int64)
+        self._turns = np.zeros(games, dtype=np.int64)
+        self._cmp = np.zeros(games, dtype=np.int64)
+        self._mpa_sum = np.zeros(games)
+        self._mpa_count = np.zeros(games, dtype=np.int64)
+        self._left_moves = np.zeros(games, dtype=np.int64)
+        self._right_moves = np.zeros(games, dtype=np.int64)
+        self._straight_moves = np.zeros(games, dtype=np.int64)
+        all_games = np.arange(games)
+        self._place_snakes()
+        self._spawn_apples(all_games)
+        self._moves_limit[:] = (np.ceil(3 * self._cmp) if mode == 'autoT' else self._apple_limit)
+        self._set_vision(all_games)
+
+    @property
+    def vision_type(self) -> str:
+        return self._vision_type
+
+    @property
+    def games(self) -> int:
+        return self._games
+
+    @property
+    def grid(self) -> np.ndarray:
+        """
+        Grids of all the games as a (games, rows, cols) view
+        :return:
+        """
+        return self._grid[:, :self._cells].reshape(self._games, self._rows, self._cols)
+
+    @property
+    def vision(self) -> np.ndarray:
+        """
+        Vision of all the games as a (games, 22) array, only meaningful for live games
+        :return:
+        """
+        return self._vision
+
+    @property
+    def directions(self) -> np.ndarray:
+        """
+        Current head direction code of each game, see CLK_DIRS
+        :return:
+        """
+        return self._dir
+
+    @property
+    def alive(self) -> np.ndarray:
+        """
+        Mask with the games that are still running
+        :return:
+        """
+        return self._running & ~self._completed
+
+    @property
+    def live(self) -> np.ndarray:
+        """
+        Indices of the games that are still running
+        :return:
+        """
+        return np.flatnonzero(self.alive)
+
+    @property
+    def running(self) -> bool:
+        """
+        Flag to check if any of the games should continue running
+        :return:
+        """
+        return bool(self.alive.any())
+
+    @property
+    def stats(self) -> list[dict[str, int | float]]:
+        """
+        Produces a list with the stats dictionary of each game, same format as StatsStruct.get_stats
+        :return:
+        """
+        accuracy = np.where(self._score != 0, self._score / self._max_score, 0)
+        efficiency = np.divide(self._mpa_sum, self._mpa_count, out=np.zeros(self._games), where=self._mpa_count != 0)
+        return [{'max_score': self._max_score, 'score': int(self._score[i]), 'moves': int(self._total_moves[i]),
+                 'turns': int(self._turns[i]), 'accuracy': float(accuracy[i]), 'efficiency': float(efficiency[i]),
+                 'lmoves': int(self._left_moves[i]), 'rmoves': int(self._right_moves[i]),
+                 'smoves': int(self._straight_moves[i])} for i in range(self._games)]
+
+    def stats_table(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Produces the stats of all the games in columnar form, see StatsTable
+        :param ids: id of the individual that plays each game
+        :return: structured array with one row per game
+        """
+        table = np.zeros(self._games, dtype=StatsTable.dtype)
+        table['id'] = ids
+        table['episodes'] = 1
+        table['max_score'] = self._max_score
+        table['score'] = self._score
+        table['moves'] = self._total_moves
+        table['turns'] = self._turns
+        table['accuracy'] = np.where(self._score != 0, self._score / self._max_score, 0)
+        table['efficiency'] = np.divide(self._mpa_sum, self._mpa_count, out=np.zeros(self._games),
+                                        where=self._mpa_count != 0)
+        table['lmoves'] = self._left_moves
+        table['rmoves'] = self._right_moves
+        table['smoves'] = self._straight_moves
+        return table
+
+    def _ray_table(self) -> np.ndarray:
+        """
+        Produces for every cell the cells seen along each axis [up, left, down, right] ordered by distance,
+        the rays are padded with the sentinel cell
+        :return: (cells, 4, max(rows, cols) - 1) array of flat cell indices
+        """
+        length = max(self._rows, self._cols) - 1
+        rays = np.full((self._cells, 4, length), self._cells, dtype=np.int32)
+        for row in range(self._rows):
+            for col in range(self._cols):
+                for axis, (y_step, x_step) in enumerate(BatchedSnakeCore.STEPS):
+                    i, j, k = row + y_step, col + x_step, 0
+                    while 0 <= i < self._rows and 0 <= j < self._cols:
+                        rays[row * self._cols + col, axis, k] = i * self._cols + j
+                        i, j, k = i + y_step, j + x_step, k + 1
+        return rays
+
+    def _place_snakes(self) -> None:
+        """
+        Places the initial snake in every grid at the bottom center
+        :return None:
+        """
+        row = self._rows // 2 + 2
+        col = self._cols // 2
+        for i in range(3):
+            self._body[:, i] = (row - i) * self._cols + col
+            self._grid[:, (row - i) * self._cols + col] = GridDict.BODY.value
+        self._grid[:, (row - 2) * self._cols + col] = GridDict.HEAD.value
+        self._head[:] = (row - 2) * self._cols + col
+        self._head_ptr[:] = 2
+        self._length[:] = 3
+        self._dir[:] = BatchedSnakeCore.CLK_DIRS.index(GameDirection.UP)
+
+    def _spawn_apples(self, games: np.ndarray) -> None:
+        """
+        Places the apple in a random free spot of each given game grid, and calculates the min path to it
+        :param games: indices of the games that need a new apple
+        :return None:
+        """
+        for game in games:
+            indices = np.flatnonzero(self._grid[game, :self._cells] == GridDict.EMPTY.value)
+            if self._rngs is None:
+                self._apple[game] = indices[random.randint(0, len(indices) - 1)]
+            else:
+                self._apple[game] = indices[self._rngs[game].integers(len(indices))]
+        self._grid[games, self._apple[games]] = GridDict.APPLE.value
+        self._cmp[games] = self._min_paths(games)
+
+    def _min_paths(self, games: np.ndarray) -> np.ndarray:
+        """
+        Calculates the length of the min path between the head and the apple of the given games using a breadth-first
+        search over all the grids at once, it is 0 when there is no path, as the A* used by SnakeCore
+        :param games: indices of the games
+        :return: array with the path lengths
+        """
+        count = len(games)
+        lengths = np.zeros(count, dtype=np.int64)
+        if count == 0:
+            return lengths
+        index = np.arange(count)
+        free = (self._grid[games, :self._cells] != GridDict.BODY.value).reshape(count, self._rows, self._cols)
+        head_r, head_c = np.divmod(self._head[games], self._cols)
+        apple_r, apple_c = np.divmod(self._apple[games], self._cols)
+        reached = np.zeros_like(free)
+        reached[index, head_r, head_c] = True
+        frontier = reached.copy()
+        pending = np.ones(count, dtype=bool)
+        steps = 0
+        while pending.any():
+            steps += 1
+            grown = np.zeros_like(frontier)
+            grown[:, 1:, :] |= frontier[:, :-1, :]
+            grown[:, :-1, :] |= frontier[:, 1:, :]
+            grown[:, :, 1:] |= frontier[:, :, :-1]
+            grown[:, :, :-1] |= frontier[:, :, 1:]
+            frontier = grown & free & ~reached
+            frontier[~pending] = False
+            reached |= frontier
+            found = pending & frontier[index, apple_r, apple_c]
+            lengths[found] = steps
+            pending &= ~found & frontier.any(axis=(1, 2))
+        return lengths
+
+    def _set_vision(self, games: np.ndarray) -> None:
+        """
+        Produces the vision of the given games, same layout as SnakeCore vision, the axis vision followed by the head
+        direction, the tail direction and the grid occupancy
+        :param games: indices of the games
+        :return:
+        """
+        if len(games) == 0:
+            return
+        head_r, head_c = np.divmod(self._head[games], self._cols)
+        apple = self._apple[games]
+        has_apple = apple >= 0
+        apple_r, apple_c = np.divmod(apple, self._cols)
+        vision = np.zeros((len(games), 22))
+        if self._vision_type == 'binary':
+            # Neighbours ordered as [down, right, up, left]
+            rows = head_r[:, None] + np.array([1, 0, -1, 0])
+            cols = head_c[:, None] + np.array([0, 1, 0, -1])
+            inside = (rows >= 0) & (rows < self._rows) & (cols >= 0) & (cols < self._cols)
+            cells = np.where(inside, rows * self._cols + cols, self._cells)
+            vision[:, 0:4] = ~inside
+            vision[:, 4:8] = self._grid[games[:, None], cells] == GridDict.BODY.value
+            vision[:, 8] = has_apple & (apple_r > head_r)
+            vision[:, 9] = has_apple & (apple_c > head_c)
+            vision[:, 10] = has_apple & (apple_r < head_r)
+            vision[:, 11] = has_apple & (apple_c < head_c)
+        else:
+            # Axes ordered as [up, left, down, right]
+            vision[:, 0] = 1 / (head_r + 1)
+            vision[:, 1] = 1 / (head_c + 1)
+            vision[:, 2] = 1 / (self._rows - head_r)
+            vision[:, 3] = 1 / (self._cols - head_c)
+            body = self._grid[games[:, None, None], self._rays[self._head[games]]] == GridDict.BODY.value
+            first = np.argmax(body, axis=2)
+            vision[:, 4:8] = np.where(body.any(axis=2), 1 / (first + 1), 0)
+            dist_y = np.where(has_apple, apple_r - head_r, 0)
+            dist_x = np.where(has_apple, apple_c - head_c, 0)
+            with np.errstate(divide='ignore'):
+                vision[:, 8] = np.where(dist_y < 0, 1 / np.abs(dist_y), 0)
+                vision[:, 9] = np.where(dist_x < 0, 1 / np.abs(dist_x), 0)
+                vision[:, 10] = np.where(dist_y > 0, 1 / dist_y, 0)
+                vision[:, 11] = np.where(dist_x > 0, 1 / dist_x, 0)
+        # Head and tail directions
+        vision[:, 12:16] = BatchedSnakeCore.NN_DIRS[self._dir[games]]
+        tail = self._body[games, self._tail_ptr[games]]
+        pre_tail = self._body[games, (self._tail_ptr[games] + 1) % self._capacity]
+        step = pre_tail - tail
+        tail_dir = np.select([step == -self._cols, step == -1, step == self._cols], [0, 1, 2], 3)
+        vision[:, 16:20] = BatchedSnakeCore.NN_DIRS[tail_dir]
+        # Grid occupancy
+        snake_space = self._length[games] / self._cells
+        vision[:, 20] = 1 - snake_space
+        vision[:, 21] = snake_space
+        self._vision[games] = vision
+
+    def next_state(self, directions: np.ndarray) -> None:
+        """
+        Calculates the next state of every live game based on its current state and the input to the system
+        :param directions: direction code for each game, see CLK_DIRS, entries of finished games are ignored
+        :return:
+        """
+        live = self.live
+        if len(live) == 0:
+            return
+        new_dir = directions[live].astype(np.int8)
+        # Update spinning direction check
+        spin = (new_dir - self._dir[live]) % 4
+        turn = spin != 0
+        self._left_moves[live] += spin == 1
+        self._right_moves[live] += spin > 1
+        self._straight_moves[live] += spin == 0
+        self._dir[live] = new_dir
+        # Determine the next position of the heads
+        rows, cols = np.divmod(self._head[live], self._cols)
+        rows = rows + BatchedSnakeCore.STEPS[new_dir, 0]
+        cols = cols + BatchedSnakeCore.STEPS[new_dir, 1]
+        inside = (rows >= 0) & (rows < self._rows) & (cols >= 0) & (cols < self._cols)
+        cells = np.where(inside, rows * self._cols + cols, self._cells)
+        # Check collisions against the walls and the body, and kill the games taking too many steps
+        dead = ~inside | (self._grid[live, cells] == GridDict.BODY.value) | (self._moves_limit[live] == 0)
+        self._running[live[dead]] = False
+        games = live[~dead]
+        cells = cells[~dead]
+        turn = turn[~dead]
+        # Update heads
+        self._grid[games, self._head[games]] = GridDict.BODY.value
+        self._grid[games, cells] = GridDict.HEAD.value
+        self._head_ptr[games] = (self._head_ptr[games] + 1) % self._capacity
+        self._body[games, self._head_ptr[games]] = cells
+        self._head[games] = cells
+        self._length[games] += 1
+        self._total_moves[games] += 1
+        self._moves[games] += 1
+        self._turns[games] += turn
+        grow = cells == self._apple[games]
+        # Update tails
+        moving = games[~grow]
+        self._grid[moving, self._body[moving, self._tail_ptr[moving]]] = GridDict.EMPTY.value
+        self._tail_ptr[moving] = (self._tail_ptr[moving] + 1) % self._capacity
+        self._length[moving] -= 1
+        self._moves_limit[moving] -= 1
+        # Update current minimum path if necessary
+        blocked = moving[self._cmp[moving] == 0]
+        if len(blocked) > 0:
+            self._cmp[blocked] = self._min_paths(blocked)
+        # Spawn new apples
+        eating = games[grow]
+        if len(eating) > 0:
+            reachable = eating[self._cmp[eating] > 0]
+            self._mpa_sum[reachable] += 1 / (self._moves[reachable] / self._cmp[reachable])
+            self._mpa_count[reachable] += 1
+            self._score[eating] += 1
+            self._moves[eating] = 0
+            self._moves_limit[eating] = self._apple_limit
+            # Check if the games are completed else spawn new apples
+            completed = self._score[eating] == self._max_score
+            self._completed[eating[completed]] = True
+            self._apple[eating[completed]] = -1
+            self._spawn_apples(eating[~completed])
+        # Produce vision for the controllers
+        self._set_vision(games)
@@ -23,13 +23,19 @@ class SnakeCore:
 
     # Class constants
     MODES = {'human', 'autoT', 'autoP'}
+    CMP_MODES = {'eager', 'lazy', 'completed'}
 
-    def __init__(self, size: tuple[int, int], mode: str, vision: str):
+    def __init__(self, size: tuple[int, int], mode: str, vision: str, cmp_mode: str = 'eager',
+                 rng: np.random.Generator | None = None):
         """
         Constructor
         :param size: Grid size
         :param mode: flag to indicate if the extra calculations for NN controlling must be processed
-        :param
+        :param vision: type of vision identifier
+        :param cmp_mode: when the min path to each apple, needed for the efficiency, is calculated. 'eager' at every
+        apple spawn, 'lazy' all at once when the game ends, 'completed' like 'lazy' but just for completed games, the
+        efficiency of the rest is 0. The min path to the first apple is always eager
+        :param rng: random generator used to place the apples, the global random state is used if None
         """
         if size[0] < 10 or size[1] < 10:
             raise ValueError("Minimum grid size supported (10 , 10)")
@@ -40,12 +46,15 @@ class SnakeCore:
             self._auto = True
         else:
             self._auto = False
+        if cmp_mode not in SnakeCore.CMP_MODES:
+            raise ValueError(f"Min path mode {cmp_mode} not supported. Supported modes {SnakeCore.CMP_MODES}")
+        self._rng = rng
         self._vision_type = vision
         self._vision: np.ndarray = np.empty(0)
         self._dist = GridOps(vision)
         self._rows = size[0]
         self._cols = size[1]
-        self._snake = BlockLinkedList()
+        self._snake = BlockLinkedList(rows=self._rows, cols=self._cols)
         self._apple: Cell
         self._grid = np.zeros((self._rows, self._cols))
         self._running = True
@@ -53,6 +62,13 @@ class SnakeCore:
         self._stats_data = StatsStruct(rows=self._rows, cols=self._cols)
         self._moves_limit = 0
         self._last_turn = None
+        # Deferred min paths, the cells visited by the head, the moves where an apple was eaten and the apples whose
+        # min path is pending as (apple cell, spawn move, eat move). They are not recorded in eager mode
+        self._cmp_mode = cmp_mode
+        self._trail: list[int] = []
+        self._eat_moves: list[int] = []
+        self._pending_cmp: list[tuple[int, int, int]] = []
+        self._spawn_move: int | None = None
         self._place_snake()
         self._spawn_apple()
         self._set_cmp()
@@ -107,7 +123,7 @@ class SnakeCore:
         Sets the length of the current min path to the apple
         :return:
         """
-        self._stats_data.cmp = len(self._dist.a_star(self.grid, self.head.pos(), self._apple))
+        self._stats_data.cmp = self._dist.min_path_len(self._grid, self.head.pos(), self._apple)
 
     def _place_snake(self) -> None:
         """
@@ -120,6 +136,8 @@ class SnakeCore:
         # Add three blocks to the body
         for i in range(3):
             self._snake.add((row - i, col), GameDirection.UP)
+            if self._cmp_mode != 'eager':
+                self._trail.append((row - i) * self._cols + col)
             if i == 2:
                 self.grid = (row - i, col, GridDict.HEAD.value)
             else:
@@ -132,12 +150,13 @@ class SnakeCore:
         """
         row_indices, col_indices = np.where(self.grid == 0)
         indices = list(zip(row_indices, col_indices))
-        index = indices[random.randint(0, len(indices) - 1)]
+        if self._rng is None:
+            index = indices[random.randint(0, len(indices) - 1)]
+        else:
+            index = indices[self._rng.integers(len(indices))]
         self._apple = Cell(index[0], index[1])
         # Update the apple position in the grid
         self.grid = (self._apple.row, self._apple.col, GridDict.APPLE.value)
-        # calculate minimal path from the head to the apple
-        self._set_cmp()
 
     def _collision(self) -> bool:
         """
@@ -148,7 +167,7 @@ class SnakeCore:
         if self.head.row > self._rows - 1 or self.head.row < 0 or self.head.col < 0 or self.head.col > self._cols - 1:
             return True
         # Collide against the body
-        if self.head.pos() in self._snake.body_map:
+        if self._snake.occupied(self.head.pos()):
             return True
         return False
 
@@ -192,6 +211,8 @@ class SnakeCore:
             self._running = False
         # Update grid head position
         if self._running:
+            if self._cmp_mode != 'eager':
+                self._trail.append(self.head.row * self._cols + self.head.col)
             self.grid = (self.head.row, self.head.col, GridDict.HEAD.value)
             self.grid = (self.head.prev.row, self.head.prev.col, GridDict.BODY.value)
             # Update tail
@@ -208,17 +229,27 @@ class SnakeCore:
                 score = True
                 self._moves_limit = math.ceil((self._rows * self._cols) * 1.5)
                 self._stats_data.add_move(turn=turn, score=score)
+                if self._cmp_mode != 'eager':
+                    self._eat_moves.append(len(self._trail) - 1)
+                    if self._spawn_move is not None:
+                        self._pending_cmp.append((self._apple.row * self._cols + self._apple.col, self._spawn_move,
+                                                  len(self._trail) - 1))
                 # Check if the game is completed else spawn a new apple
                 self._completed = self._stats_data.completed()
                 if not self._completed:
                     self._spawn_apple()
+                    if self._cmp_mode == 'eager':
+                        self._set_cmp()
+                    else:
+                        self._stats_data.cmp = -1
+                        self._spawn_move = len(self._trail) - 1
                 else:
-                    self._stats_data.final_stats()
+                    self._final_stats()
             # Produce vision for auto-controller
             if self._auto:
                 self._set_vision()
         else:
-            self._stats_data.final_stats()
+            self._final_stats()
 
     def _set_vision(self) -> None:
         """
@@ -226,9 +257,43 @@ class SnakeCore:
         element the type of object detect [wall, body, apple] and fourth one indicates the distance
         :return:
         """
-        axis = self._dist.vision(self.grid)
+        # A completed game has no apple, the last one is under the head
+        axis = self._dist.vision_at(self._grid, self.head.pos(), None if self._completed else self._apple)
         head_dir = NNDirection[self.head.dir[0].name].value
         tail_dir = NNDirection[self.tail.dir[0].name].value
         snake_space = self._snake.length / (self._rows * self._cols)
         grid_space = [1 - snake_space, snake_space]
         self._vision = np.concatenate((axis, head_dir, tail_dir, grid_space))
+
+    def _final_stats(self) -> None:
+        """
+        Calculates the stats of the finished game, resolving the deferred min paths if any
+        :return:
+        """
+        if self._cmp_mode == 'lazy' or (self._cmp_mode == 'completed' and self._completed):
+            self._resolve_cmp()
+        elif self._cmp_mode == 'completed':
+            # The entry of the first apple, whose min path is always eager, must not count for an unfinished game
+            self._stats_data.mpa.clear()
+        self._stats_data.final_stats()
+
+    def _resolve_cmp(self) -> None:
+        """
+        Calculates the deferred min paths of the eaten apples and adds their entries to the efficiency. The grid at
+        any move is rebuilt from the trail, the body is made of the last cells visited by the head. As in eager mode,
+        when there is no path at the spawn it is looked for again after every move until the apple is eaten
+        :return:
+        """
+        trail = np.array(self._trail)
+        eat_moves = np.array(self._eat_moves)
+        for apple, spawn, eat in self._pending_cmp:
+            length = 3 + int(np.count_nonzero(eat_moves <= spawn))
+            for move in range(spawn, eat):
+                grid = np.zeros(self._rows * self._cols)
+                grid[trail[move - length + 1:move]] = GridDict.BODY.value
+                head = divmod(int(trail[move]), self._cols)
+                cmp = self._dist.min_path_len(grid.reshape(self._rows, self._cols), head, divmod(apple, self._cols))
+                if cmp > 0:
+                    self._stats_data.mpa.append(1 / ((eat - spawn) / cmp))
+                    break
+        self._pending_cmp = []
@@ -4,9 +4,7 @@
 # Date: 17/05/2023
 # Version: 0.0.1
 
-from snake_ai.snake.vision.dist_factory import DistanceFactory
-from snake_ai.snake.enums import GridDict, Step
-from queue import PriorityQueue
+from snake_ai.snake.enums import GridDict
 import numpy as np
 
 
@@ -14,212 +12,200 @@ class GridOps:
     """
     This class provides the operations with in the grid where is displayed the snake board
     """
+    # Wall distances, rays and neighbours of every cell by grid size, shared by all the instances
+    _tables: dict[tuple[int, int], tuple[dict, dict, tuple]] = {}
+
     def __init__(self, vision: str):
         """
         Constructor
         :param vision: type of vision identifier
         """
-        self._manhattan = DistanceFactory().get_instance('Manhattan')
         if vision in ['binary', 'real']:
             if vision == 'binary':
-                self.vision = self._binary_vision
+                self.vision_at = self._binary_vision
             else:
-                self.vision = self._real_vision
+                self.vision_at = self._real_vision
         else:
             raise ValueError(f'vision type: "{vision}" not supported')
 
-    @staticmethod
-    def _belong(dimensions: tuple[int, ...], point: np.ndarray) -> bool:
+    @classmethod
+    def _grid_tables(cls, shape: tuple[int, ...]) -> tuple[dict, dict, tuple]:
         """
-        Checks if a given point belong to and N x M grid
-        :param dimensions: weight and height of the grid
-        :param point: cell
-        :return:
+        Produces, once per grid size, for every cell the vision of the walls, the flat indices of the cells seen
+        along each axis [up, left, down, right] ordered by distance and the flat indices of its neighbours in the
+        order [right, down, left, up]
+        :param shape: grid size
+        :return: wall vision and rays of each cell, neighbours of each flat cell index
         """
-        dim = np.array([dimensions[0]-1, dimensions[1]-1])
-        if np.all(point >= 0) and (np.all((point <= dim) == True)):
-            return True
-        else:
-            return False
+        shape = (shape[0], shape[1])
+        if shape not in cls._tables:
+            rows, cols = shape
+            walls = {}
+            rays = {}
+            neighbours = []
+            for row in range(rows):
+                for col in range(cols):
+                    walls[(row, col)] = (1 / (row + 1), 1 / (col + 1), 1 / (rows - row), 1 / (cols - col))
+                    rays[(row, col)] = (tuple(i * cols + col for i in range(row - 1, -1, -1)),
+                                        tuple(row * cols + j for j in range(col - 1, -1, -1)),
+                                        tuple(i * cols + col for i in range(row + 1, rows)),
+                                        tuple(row * cols + j for j in range(col + 1, cols)))
+                    neighbours.append(tuple(i * cols + j for i, j in [(row, col + 1), (row + 1, col),
+                                                                      (row, col - 1), (row - 1, col)]
+                                            if 0 <= i < rows and 0 <= j < cols))
+            cls._tables[shape] = (walls, rays, tuple(neighbours))
+        return cls._tables[shape]
 
-    def _axis_vision(self, matrix: np.ndarray, center: np.ndarray, x_step: int = 0, y_step: int = 0) -> list[float]:
-        """
-        Calculates the distance from a cell along a scroll to find an object, used to find the distance between
-        the head of the snake and the rest of possible objects
-        :param matrix: grid where to calculate the distance
-        :param center: cells from where to calculate the distance
-        :param x_step: displacement over x at each iteration
-        :param y_step: displacement over y at each iteration
-        :return vision: an array of four elements where the 3 first digits indicates the type of object
-        found in the axis [wall, body, apple] and the fourth one the distance to it
-        """
-        step = np.array([y_step, x_step])
-        ref = center + step
-        vision = [0.0, 0.0]
-        steps = 1
-        found = False
-        # Loop locking for collisions
-        while GridOps._belong(matrix.shape, ref):
-            value = matrix[ref[0], ref[1]]
-            if value == GridDict.BODY.value and not found:
-                vision[1] = 1 / steps
-                ref = ref + step
-                found = True
-            else:
-                ref = ref + step
-            steps += 1
-        # If a position outside the grid is reached without finding a collision the distance to the wall is calculated
-        # instead
-        else:
-            vision[0] = 1 / steps
-        return vision
-
-    def _real_vision(self, matrix: np.ndarray) -> np.ndarray:
+    def vision(self, matrix: np.ndarray) -> np.ndarray:
         """
-        Uses the method bellow over 8 axes around the origin cell to check for collisions
+        Produces the vision of the snake looking for its head and the apple in the grid, use vision_at when their
+        positions are already known
         :param matrix: grid where to look at
         :return: an array with the vision over each axis concatenated
         """
-        center_y, center_x = np.where(matrix == GridDict.HEAD.value)
-        center = np.array([center_y[0], center_x[0]])
-        vision_wall = []
-        vision_body = []
-        vision_apple = [0, 0, 0, 0]
-        # Calculate te distances in all axes
-        for step in [-1, 1]:
-            vision_y = self._axis_vision(matrix, center, 0, step)
-            vision_x = self._axis_vision(matrix, center, step, 0)
-            vision_wall.extend([vision_y[0], vision_x[0]])
-            vision_body.extend([vision_y[1], vision_x[1]])
-        # Distance to apple
+        head_y, head_x = np.where(matrix == GridDict.HEAD.value)
         apple_y, apple_x = np.where(matrix == GridDict.APPLE.value)
-        dist_y = apple_y - center_y
-        dist_x = apple_x - center_x
-        if dist_y > 0:
-            vision_apple[2] = 1 / dist_y[0]
-        else:
-            if dist_y != 0:
-                vision_apple[0] = 1 / abs(dist_y[0])
-        if dist_x > 0:
-            vision_apple[3] = 1 / dist_x[0]
-        else:
-            if dist_x != 0:
-                vision_apple[1] = 1 / abs(dist_x[0])
-        return np.array(vision_wall + vision_body + vision_apple)
+        apple = (int(apple_y[0]), int(apple_x[0])) if len(apple_y) > 0 else None
+        return self.vision_at(matrix, (int(head_y[0]), int(head_x[0])), apple)
 
-    def _binary_vision(self, matrix: np.ndarray) -> np.ndarray:
-        center_y, center_x = np.where(matrix == GridDict.HEAD.value)
-        center = np.array([center_y[0], center_x[0]])
+    @staticmethod
+    def _real_vision(matrix: np.ndarray, head: tuple[int, int], apple: tuple[int, int] | None) -> np.ndarray:
+        """
+        Looks along the 4 axes around the head for the walls and the body, every ray stops at the first body cell
+        :param matrix: grid where to look at
+        :param head: head cell
+        :param apple: apple cell, None if there is no apple in the grid
+        :return: an array with the vision of the walls, the body and the apple over each axis concatenated
+        """
+        walls, rays = GridOps._grid_tables(matrix.shape)[:2]
+        vision_body = [0.0, 0.0, 0.0, 0.0]
+        vision_apple = [0.0, 0.0, 0.0, 0.0]
+        for axis, ray in enumerate(rays[head]):
+            for steps, cell in enumerate(ray, 1):
+                if matrix.item(cell) == GridDict.BODY.value:
+                    vision_body[axis] = 1 / steps
+                    break
+        # Distance to apple
+        if apple is not None:
+            dist_y = apple[0] - head[0]
+            dist_x = apple[1] - head[1]
+            if dist_y > 0:
+                vision_apple[2] = 1 / dist_y
+            elif dist_y < 0:
+                vision_apple[0] = 1 / -dist_y
+            if dist_x > 0:
+                vision_apple[3] = 1 / dist_x
+            elif dist_x < 0:
+                vision_apple[1] = 1 / -dist_x
+        return np.array([*walls[head], *vision_body, *vision_apple])
+
+    @staticmethod
+    def _binary_vision(matrix: np.ndarray, head: tuple[int, int], apple: tuple[int, int] | None) -> np.ndarray:
+        """
+        Checks for walls and body around the head and for the apple side, the neighbours are looked at in the
+        order [down, right, up, left]
+        :param matrix: grid where to look at
+        :param head: head cell
+        :param apple: apple cell, None if there is no apple in the grid
+        :return: an array with the vision of the walls, the body and the apple concatenated
+        """
+        rays = GridOps._grid_tables(matrix.shape)[1][head]
         wall_vision = [0, 0, 0, 0]
         body_vision = [0, 0, 0, 0]
-        apple_vision = [0, 0, 0, 0]
-        neighbours = {}
-        axis_counter = 0
+        apple_vision = [0.0, 0.0, 0.0, 0.0]
         # Check for collisions around the head
-        for i in range(-1, 2, 2):
-            neighbours[axis_counter] = (center - np.array([i, 0]))
-            neighbours[axis_counter + 1] = (center - np.array([0, i]))
-            axis_counter += 2
-        for position, neighbour in neighbours.items():
-            if not GridOps._belong(matrix.shape, neighbour):
+        for position, axis in enumerate((2, 3, 0, 1)):
+            if not rays[axis]:
                 wall_vision[position] = 1
-            else:
-                value = matrix[neighbour[0], neighbour[1]]
-                if value == GridDict.BODY.value:
-                    body_vision[position] = 1
-        apple_y, apple_x = np.where(matrix == GridDict.APPLE.value)
-        for i in range(4):
-            if apple_y >= center_y:
-                if apple_y > center_y:
-                    apple_vision[0] = 1.0
-            else:
+            elif matrix.item(rays[axis][0]) == GridDict.BODY.value:
+                body_vision[position] = 1
+        if apple is not None:
+            if apple[0] > head[0]:
+                apple_vision[0] = 1.0
+            elif apple[0] < head[0]:
                 apple_vision[2] = 1.0
-            if apple_x >= center_x:
-                if apple_x > center_x:
-                    apple_vision[1] = 1.0
-            else:
+            if apple[1] > head[1]:
+                apple_vision[1] = 1.0
+            elif apple[1] < head[1]:
                 apple_vision[3] = 1.0
         return np.array(wall_vision + body_vision + apple_vision)
 
     @staticmethod
-    def _graph(matrix: np.ndarray) -> dict[tuple[int, int], list[tuple[int, int]]]:
-        """
-        It produces a dictionary that represents a graph that in turn represent the grid
-        :param matrix: grid on which the graph is produced
-        :return:
-        """
-        edges = [Step.X.value['right'], Step.X.value['left']]
-        x, y = matrix.shape
-        max_cell = (x - 1, y - 1)
-        graph = {}
-        neighbours = []
-        valid_neighbours = []
-        for i in range(x):
-            for j in range(y):
-                if matrix[i, j] != 1:
-                    for w in range(len(edges)):
-                        neighbours.append((i, j + edges[w]))
-                        neighbours.append((i + edges[w], j))
-                    for neighbour in neighbours:
-                        if ((0 <= neighbour[0] <= max_cell[0]) and (0 <= neighbour[1] <= max_cell[1]))\
-                                and matrix[neighbour] != 1:
-                            valid_neighbours.append(neighbour)
-                    graph.update([((i, j), list(valid_neighbours))])
-                    neighbours.clear()
-                    valid_neighbours.clear()
-        return graph
-
-    def a_star(self, matrix: np.ndarray, start_cell: tuple[int, int], target_cell: tuple[int, int]):
+    def _search(matrix: np.ndarray, start_cell: tuple[int, int], target_cell: tuple[int, int]) -> list[int] | None:
         """
-        This function implements the A* algorithm over a graph between to points
+        Breadth first search over the cells that are not body, every move costs the same so it finds the same
+        shortest paths than A*. The neighbours are expanded in the order [right, down, left, up]
         :param matrix: grid where to calculate the path
         :param start_cell: origin cell
         :param target_cell: target cell
-        :return path: the path found between the two cells if exists
-        """
-        def upd_score(g_score: float, node: tuple[int, int], predecessor: tuple[int, int] = None):
-            nonlocal path, processed, open_hash, f_scores, g_scores, open
-            if g_score < g_scores[node]:
-                g_scores[node] = g_score
-                f_scores[node] = g_score + self._manhattan.dist(grid_dim, np.array(start_cell), np.array(target_cell))
-                if predecessor is not None:
-                    path[node] = predecessor
-                if node not in open_hash:
-                    processed += 1
-                    open.put((f_scores[node], processed, node))
-                    open_hash.add(node)
+        :return previous: predecessor of each flat cell index reached, None if there is no path
+        """
+        rows, cols = matrix.shape
+        if not (0 <= start_cell[0] < rows and 0 <= start_cell[1] < cols and
+                0 <= target_cell[0] < rows and 0 <= target_cell[1] < cols):
+            return None
+        start = start_cell[0] * cols + start_cell[1]
+        target = target_cell[0] * cols + target_cell[1]
+        free = (matrix.ravel() != GridDict.BODY.value).tolist()
+        if start == target or not free[start] or not free[target]:
+            return None
+        neighbours = GridOps._grid_tables(matrix.shape)[2]
+        previous = [-1] * (rows * cols)
+        free[start] = False
+        frontier = [start]
+        while frontier:
+            next_frontier = []
+            for cell in frontier:
+                for neighbour in neighbours[cell]:
+                    if free[neighbour]:
+                        free[neighbour] = False
+                        previous[neighbour] = cell
+                        if neighbour == target:
+                            return previous
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return None
 
-        def path_reverse(path: dict[tuple[int, int], tuple[int, int]]):
-            current = target_cell
-            start = start_cell
-            rev_path = []
-            while current != start:
-                rev_path.append(path[current])
-                current = path[current]
-            rev_path.reverse()
-            return rev_path
-        try:
-            graph = self._graph(matrix)
-            grid_dim = matrix.shape
-            path = {}
-            processed = -1
-            open = PriorityQueue()
-            open_hash = set()
-            f_scores = {node: float('inf') for node in graph.keys()}
-            g_scores = {node: float('inf') for node in graph.keys()}
-            # Insert starting node
-            upd_score(g_score=0, node=start_cell)
-            # Process neighbours
-            while not open.empty():
-                node = open.get()[2]
-                open_hash.remove(node)
-                tmp_score = g_scores[node] + 1
-                # Check if the target node was reached
-                if node == target_cell:
-                    return path_reverse(path)
-                # Process all adjacent nodes
-                for neighbour in graph[node]:
-                    upd_score(g_score=tmp_score, node=neighbour, predecessor=node)
-        except Exception:
+    def a_star(self, matrix: np.ndarray, start_cell: tuple[int, int], target_cell: tuple[int, int]) \
+            -> list[tuple[int, int]]:
+        """
+        Calculates a shortest path between two cells avoiding the body of the snake
+        :param matrix: grid where to calculate the path
+        :param start_cell: origin cell
+        :param target_cell: target cell
+        :return path: the cells of the path found from the origin to the one before the target, empty if there is
+        no path
+        """
+        previous = GridOps._search(matrix, start_cell, target_cell)
+        if previous is None:
             return []
-        return []
+        cols = matrix.shape[1]
+        start = start_cell[0] * cols + start_cell[1]
+        cell = previous[target_cell[0] * cols + target_cell[1]]
+        path = []
+        while cell != start:
+            path.append(divmod(cell, cols))
+            cell = previous[cell]
+        path.append(divmod(start, cols))
+        path.reverse()
+        return path
+
+    def min_path_len(self, matrix: np.ndarray, start_cell: tuple[int, int], target_cell: tuple[int, int]) -> int:
+        """
+        Calculates the length of a shortest path between two cells avoiding the body of the snake
+        :param matrix: grid where to calculate the path
+        :param start_cell: origin cell
+        :param target_cell: target cell
+        :return: number of moves of the path, 0 if there is no path
+        """
+        previous = GridOps._search(matrix, start_cell, target_cell)
+        if previous is None:
+            return 0
+        cols = matrix.shape[1]
+        start = start_cell[0] * cols + start_cell[1]
+        cell = target_cell[0] * cols + target_cell[1]
+        length = 0
+        while cell != start:
+            cell = previous[cell]
+            length += 1
+        return length
@@ -0,0 +1,251 @@
+# This module contains the command line entry point to train a population without the GUI, e.g.
+# python -m snake_ai.train --config training.toml --generations 500 --output progress.jsonl
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.trainer.worker import Worker
+from snake_ai.trainer.population_log import PopulationLog
+from snake_ai.data import Population, Folders
+from multiprocessing import Queue, Value, Array
+from dataclasses import fields
+from queue import Empty
+from typing import TextIO
+import numpy as np
+import multiprocessing
+import argparse
+import tomllib
+import signal
+import json
+import time
+import sys
+import os
+
+
+class Train:
+    """
+    Headless training, it takes the same configuration the training window passes to Worker.init from a TOML or JSON
+    file and from the command line flags. The worker runs without synchronizing with a mainloop and the stats of every
+    generation are streamed as JSON lines
+    """
+    # Configuration entries with their default values, the ones with a get in Worker.init take the same default
+    DEFAULTS = {'model': 'snake', 'game_size': (10, 10), 'cpu': os.cpu_count() or 1, 'vision': 'binary',
+                'hidden': [16], 'hidden_init': 'he', 'hidden_act': 'relu', 'output_init': 'glorot',
+                'output_act': 'softmax', 'bias': True, 'bias_init': 'zero', 'population': 200,
+                'selection': 'tournament', 'selection_param': (3, 'normal'), 'crossover': 'sbx',
+                'crossover_param': (100, 'normal'), 'crossover_rate': 0.9, 'mutation': 'gaussian',
+                'mutation_param': (0.1, 'normal'), 'mutation_rate': 0.05, 'replacement': 'steady_state',
+                'offspring': 20, 'elitism': 0, 'schedule': 'constant', 'schedule_params': None, 'optimizer': 'ga',
+                'es_sigma': None, 'es_learning_rate': 0.01, 'asynchronous': False, 'islands': 1, 'migrants': 1,
+                'migration_interval': 5, 'engine': 'pool', 'cmp_mode': 'lazy', 'seed': None, 'reevaluate': False,
+                'episodes': 1, 'halving': 2, 'checkpoint_every': 1, 'checkpoint_interval': 0.0,
+                'checkpoint_deltas': False}
+
+    @staticmethod
+    def _value(text: str) -> object:
+        """
+        Parses a command line value as JSON, the values that are not JSON are taken as strings
+        :param text: command line value
+        :return:
+        """
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
+
+    @staticmethod
+    def parser() -> argparse.ArgumentParser:
+        """
+        Produces the command line parser, every configuration entry has its own flag
+        :return:
+        """
+        parser = argparse.ArgumentParser(prog='python -m snake_ai.train',
+                                         description='Trains a population of snakes without the GUI. The stats of '
+                                                     'every generation are written as JSON lines, the best '
+                                                     'individual and the population are saved as in the GUI.')
+        parser.add_argument('-c', '--config', help='TOML or JSON file with the training configuration, the flags '
+                                                   'override its entries')
+        parser.add_argument('-p', '--population-file', help='previous population to start from, its network '
+                                                            'settings override the configuration')
+        parser.add_argument('-g', '--generations', type=int, default=0,
+                            help='generations to train, windows of population size evaluations with asynchronous '
+                                 'training, 0 trains until interrupted')
+        parser.add_argument('-t', '--time', type=float, default=0.0,
+                            help='seconds to train, 0 trains until interrupted')
+        parser.add_argument('-o', '--output', default='-', help="JSON lines progress file, '-' for stdout")
+        parser.add_argument('-q', '--quiet', action='store_true', help='does not print the progress to stderr')
+        parser.add_argument('--print-config', action='store_true',
+                            help='prints the resolved configuration as JSON and exits')
+        entries = parser.add_argument_group('configuration', 'entries of the training configuration, the values are '
+                                                             'parsed as JSON, e.g. --hidden [16,8] or '
+                                                             '--selection-param [3,"normal"]')
+        for name, default in Train.DEFAULTS.items():
+            entries.add_argument('--' + name.replace('_', '-'), dest=name, type=Train._value,
+                                 default=argparse.SUPPRESS, metavar='VALUE', help=f'default: {json.dumps(default)}')
+        return parser
+
+    @staticmethod
+    def load_config(file_path: str) -> dict:
+        """
+        Reads a configuration file, TOML when its extension is .toml and JSON otherwise
+        :param file_path: configuration file path
+        :return:
+        """
+        if os.path.splitext(file_path)[1].lower() == '.toml':
+            with open(file_path, 'rb') as file:
+                return tomllib.load(file)
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    @staticmethod
+    def config(entries: dict, prev_population: dict | None = None) -> dict:
+        """
+        Completes and normalizes a configuration as Worker.init expects it
+        :param entries: configuration entries given
+        :param prev_population: previous population if any, its network settings override the entries
+        :return:
+        """
+        unknown = set(entries) - set(Train.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown configuration entries: {sorted(unknown)}. "
+                             f"Supported entries: {list(Train.DEFAULTS.keys())}")
+        config = Train.DEFAULTS | entries
+        if prev_population is not None:
+            for field in fields(Population):
+                if field.name != 'population':
+                    config[field.name] = prev_population[field.name]
+        config['game_size'] = tuple(config['game_size'])
+        # The GUI passes the operator parameters with the state of their entry, a bare value is an enabled entry
+        for name in ('selection_param', 'crossover_param', 'mutation_param'):
+            value = config[name]
+            if value is None:
+                config[name] = (None, 'disabled')
+            elif isinstance(value, (list, tuple)):
+                config[name] = tuple(value)
+            else:
+                config[name] = (value, 'normal')
+        return config
+
+    @staticmethod
+    def _json(value: object) -> object:
+        """
+        Converts the numpy values of the stats to JSON types
+        :param value: value not supported by the json module
+        :return:
+        """
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    @staticmethod
+    def run(config: dict, prev_population: dict | None, generations: int, seconds: float, output: TextIO,
+            progress: TextIO | None) -> int:
+        """
+        Trains a population until the generations or the seconds are reached or the training is interrupted, the
+        best individual and the population are saved at the end as in the GUI
+        :param config: training configuration, see Train.config
+        :param prev_population: codification of each individual by id of a previous population if any
+        :param generations: generations to train, 0 for no limit
+        :param seconds: seconds to train, 0 for no limit
+        :param output: text stream where to write the stats of every generation as JSON lines
+        :param progress: text stream where to write a readable progress line per generation, None to not write it
+        :return: exit code, 0 if the training ends normally
+        """
+        for folder in (Folders.models_folder, Folders.populations_folder):
+            os.makedirs(folder, exist_ok=True)
+        alive, data_queue, done_queue = Value('i', 1), Queue(), Queue()
+        worker = Worker(loop_flag=alive, data_queue=data_queue, termination_queue=done_queue, sync=None,
+                        worker_state=Array('c', b'cr'))
+        worker.init(config, prev_population)
+        # Ctrl+C stops the training from this process, the training processes inherit the ignore and finish saving
+        handler = signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            process = worker.train()
+        finally:
+            signal.signal(signal.SIGINT, handler)
+        start = time.monotonic()
+        reported = 0
+
+        def write(stats: dict) -> None:
+            nonlocal reported
+            reported += 1
+            elapsed = time.monotonic() - start
+            output.write(json.dumps({'generation': reported, 'elapsed': elapsed} | stats, default=Train._json) + '\n')
+            output.flush()
+            if progress is not None:
+                progress.write(f"Generation: {reported}, Elapsed: {elapsed:.1f} s, "
+                               f"Generations/s: {reported / elapsed:.3g}, Score avg: {stats['score_avg']:.3g}, "
+                               f"Score max: {stats['score_max']}, Fitness avg: {stats['fitness_avg']:.4g}\n")
+                progress.flush()
+
+        try:
+            while (generations <= 0 or reported < generations) and (seconds <= 0 or
+                                                                   time.monotonic() - start < seconds):
+                try:
+                    write(data_queue.get(timeout=0.5))
+                except Empty:
+                    if not process.is_alive():
+                        break
+        except KeyboardInterrupt:
+            pass
+        # The worker saves the last generation before passing the final population. The generations that end while
+        # stopping are reported too, the worker can not exit until its queues are consumed
+        alive.value = 0
+        finished = False
+        while process.is_alive() or not done_queue.empty():
+            while not data_queue.empty():
+                write(data_queue.get())
+            try:
+                done_queue.get(timeout=0.5)
+                finished = True
+            except Empty:
+                pass
+        while not data_queue.empty():
+            write(data_queue.get())
+        process.join()
+        if progress is not None:
+            elapsed = time.monotonic() - start
+            progress.write(f"{'Finished' if finished else 'Failed'} after {reported} generations in {elapsed:.1f} s, "
+                           f"model saved at {os.path.join(Folders.models_folder, config['model'] + '.nn')}\n")
+        return 0 if finished else 1
+
+    @staticmethod
+    def main(argv: list[str] | None = None) -> int:
+        """
+        Parses the command line and runs the training
+        :param argv: command line arguments, the process ones if None
+        :return: exit code
+        """
+        parser = Train.parser()
+        args = vars(parser.parse_args(argv))
+        try:
+            entries = Train.load_config(args['config']) if args['config'] is not None else {}
+            entries |= {name: args[name] for name in Train.DEFAULTS if name in args}
+            prev_population = None
+            if args['population_file'] is not None:
+                # Not mapped, the population file is saved again by the checkpoints
+                prev_population = PopulationLog.load(os.path.abspath(args['population_file']), mapped=False)
+                if not isinstance(prev_population, dict):
+                    raise ValueError(f"The file {args['population_file']} does not contain a supported population "
+                                     f"or it is corrupted. Error code: {prev_population}")
+            config = Train.config(entries, prev_population)
+        except (OSError, ValueError, tomllib.TOMLDecodeError) as error:
+            parser.error(str(error))
+        if args['print_config']:
+            print(json.dumps(config, indent=4))
+            return 0
+        individuals = prev_population['population'] if prev_population is not None else None
+        if args['output'] == '-':
+            return Train.run(config, individuals, args['generations'], args['time'], sys.stdout,
+                             None if args['quiet'] else sys.stderr)
+        with open(args['output'], 'w', encoding='utf-8') as output:
+            return Train.run(config, individuals, args['generations'], args['time'], output,
+                             None if args['quiet'] else sys.stderr)
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(Train.main())
@@ -0,0 +1,134 @@
+# This module contains the class that saves the training checkpoints without stopping the training loop
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.IO import IO
+from threading import Thread, Condition
+from typing import Callable
+import copy
+import time
+import os
+
+
+class CheckpointWriter:
+    """
+    Writes the checkpoints of a training from a background thread. The training loop just takes a copy of the objects to
+    be saved, the serialization and the disk writes happen in the thread. The saves submitted while the thread is busy
+    are coalesced, just the latest one of every file is written, unless they are appends. The checkpoints can be limited
+    to every few generations and to every few seconds
+    """
+    def __init__(self, every: int = 1, interval: float = 0.0):
+        """
+        Constructor
+        :param every: minimum number of generations between checkpoints
+        :param interval: minimum seconds between checkpoints
+        """
+        if every < 1:
+            raise ValueError(f"Checkpoints must be taken every one or more generations. Found: {every}")
+        if interval < 0:
+            raise ValueError(f"Checkpoint interval must be a non negative number of seconds. Found: {interval}")
+        self._every = every
+        self._interval = interval
+        self._last_generation = 0
+        self._last_time: float | None = None
+        # Latest object to be written by file path, a newer save of the same file replaces it
+        self._pending: dict[str | int, tuple[Callable, str, str, object]] = {}
+        # Key of the next save that is not coalesced
+        self._sequence = 0
+        self._closed = False
+        self._condition: Condition | None = None
+        self._thread: Thread | None = None
+
+    def __getstate__(self) -> dict:
+        # The writer thread belongs to the process that started it
+        state = self.__dict__.copy()
+        state['_pending'] = {}
+        state['_condition'] = None
+        state['_thread'] = None
+        return state
+
+    def due(self, generation: int) -> bool:
+        """
+        Checks if a checkpoint must be taken at a generation, when it is the generation and the time are taken as the
+        last checkpoint ones
+        :param generation: generation number
+        :return:
+        """
+        now = time.monotonic()
+        if generation - self._last_generation < self._every:
+            return False
+        if self._last_time is not None and now - self._last_time < self._interval:
+            return False
+        self._last_generation = generation
+        self._last_time = now
+        return True
+
+    def submit(self, path: str, name: str, obj: object, save: Callable[[str, str, object], int] = IO.save,
+               coalesce: bool = True, supersedes: str | None = None) -> None:
+        """
+        Orders the save of an object. A deep copy of the object is taken, so it can be modified as soon as this method
+        returns. The saves are written in the order they are submitted
+        :param path: path where to save the object
+        :param name: output file name
+        :param obj: object instance to be saved
+        :param save: function that saves the object, IO.save or IO.save_population
+        :param coalesce: whether a newer save of the same file replaces this one, False for the saves that append to
+        the file
+        :param supersedes: name of a file in the same path whose pending appends are dropped when this save replaces a
+        pending one, e.g. the log started by the replaced save
+        :return:
+        """
+        snapshot = copy.deepcopy(obj)
+        if self._thread is None:
+            self._condition = Condition()
+            self._closed = False
+            self._thread = Thread(target=self._write, daemon=True)
+            self._thread.start()
+        with self._condition:
+            if coalesce:
+                key = os.path.join(path, name)
+                # Moved to the end, so it is not written before the saves submitted after the replaced one
+                if self._pending.pop(key, None) is not None and supersedes is not None:
+                    # The appends would go to the file started by the replaced save, which is never written
+                    obsolete = os.path.join(path, supersedes)
+                    self._pending = {pending: entry for pending, entry in self._pending.items()
+                                     if os.path.join(entry[1], entry[2]) != obsolete}
+            else:
+                key = self._sequence
+                self._sequence += 1
+            self._pending[key] = (save, path, name, snapshot)
+            self._condition.notify_all()
+
+    def _write(self) -> None:
+        """
+        Thread loop, writes the pending saves until the writer is closed and nothing is pending
+        :return:
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending, {}
+            for save, path, name, obj in pending.values():
+                try:
+                    save(path, name, obj)
+                except Exception:
+                    # A failed save must not stop the training, the next checkpoint overwrites the file
+                    pass
+
+    def close(self) -> None:
+        """
+        Writes the pending saves and stops the thread
+        :return:
+        """
+        if self._thread is None:
+            return
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+        self._condition = None
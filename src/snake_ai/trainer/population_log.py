@@ -0,0 +1,190 @@
+# This module contains the class that checkpoints a population as a snapshot plus a log of its changes
+
+# Author: Álvaro Torralba
+# Date: 18/10/2026
+# Version: 0.0.1
+
+from snake_ai.trainer.checkpoint import CheckpointWriter
+from snake_ai.IO import IO
+from typing import BinaryIO, Iterator
+import numpy as np
+import hashlib
+import struct
+import os
+
+
+class PopulationLog:
+    """
+    Incremental checkpoints of a population whose individuals are replaced a few at a time. The population file is a
+    full snapshot and every checkpoint appends to a log next to it the ids and codifications of the individuals that
+    have changed since the previous one, plus the fitness of the whole population. Once the log holds as many rows as
+    the population it is compacted, a new snapshot is written and the log starts again from it. The log records the
+    digest of its snapshot, a log left behind by an interrupted compaction is not applied to the new snapshot
+    """
+    # Log header: magic, format version, generation of the snapshot and digest of the snapshot codifications
+    MAGIC = b'SNAKELOG'
+    VERSION = 1
+    _HEADER = struct.Struct('<8sIQ32s')
+    # Delta header: generation, number of rows, codification length and number of individuals
+    _DELTA = struct.Struct('<QQQQ')
+    _DIGEST_SIZE = 32
+
+    def __init__(self, individuals: int):
+        """
+        Constructor
+        :param individuals: number of individuals of the population
+        """
+        self._individuals = individuals
+        # Rows changed since the last checkpoint
+        self._changed = np.zeros(individuals, dtype=bool)
+        # Rows in the log since the last snapshot, None until the first snapshot is written
+        self._logged: int | None = None
+
+    @staticmethod
+    def log_name(name: str) -> str:
+        """
+        Produces the log file name of a population file
+        :param name: population file name
+        :return:
+        """
+        return name + '.log'
+
+    def change(self, replaced: np.ndarray) -> None:
+        """
+        Records the individuals replaced in a generation
+        :param replaced: ids of the replaced individuals
+        :return:
+        """
+        self._changed[replaced - 1] = True
+
+    def checkpoint(self, checkpoints: CheckpointWriter, path: str, name: str, generation: int, population: dict,
+                   fitness: np.ndarray) -> None:
+        """
+        Orders the save of the population, as a delta with the individuals changed since the last checkpoint or as a
+        new snapshot when the log is due for compaction
+        :param checkpoints: checkpoint writer of the training
+        :param path: path of the population file
+        :param name: population file name
+        :param generation: generation number
+        :param population: population as in SnakeBatch.population
+        :param fitness: fitness of the individuals, the individual with id i is the position i - 1
+        :return:
+        """
+        changed = np.flatnonzero(self._changed)
+        if self._logged is None or self._logged + len(changed) >= self._individuals:
+            checkpoints.submit(path, name, (generation, population), save=PopulationLog.compact,
+                               supersedes=PopulationLog.log_name(name))
+            self._logged = 0
+        elif len(changed) > 0:
+            genomes = population['population']
+            delta = (generation, changed + 1, np.stack([genomes[row + 1] for row in changed]),
+                     np.asarray(fitness, dtype=np.float64))
+            checkpoints.submit(path, PopulationLog.log_name(name), delta, save=PopulationLog.append, coalesce=False)
+            self._logged += len(changed)
+        self._changed[:] = False
+
+    @staticmethod
+    def compact(path: str, name: str, snapshot: tuple[int, dict]) -> int:
+        """
+        Writes a population snapshot and starts its log, both files are replaced atomically
+        :param path: path where to save the population
+        :param name: population file name
+        :param snapshot: generation number and population as in SnakeBatch.population
+        :return:
+        """
+        generation, population = snapshot
+        IO.save_population(path, name, population)
+        digest = bytes.fromhex(IO.load_population_header(os.path.join(path, name))['digest'])
+        IO.write_atomic(path, PopulationLog.log_name(name),
+                        lambda file: file.write(PopulationLog._HEADER.pack(PopulationLog.MAGIC, PopulationLog.VERSION,
+                                                                           generation, digest)))
+        return 0
+
+    @staticmethod
+    def append(path: str, name: str, delta: tuple[int, np.ndarray, np.ndarray, np.ndarray]) -> int:
+        """
+        Appends a delta to a population log, a torn delta at the end of the log is ignored when it is read
+        :param path: path of the log
+        :param name: log file name
+        :param delta: generation number, ids of the changed individuals, their codifications and the fitness of the
+        population
+        :return:
+        """
+        generation, ids, genomes, fitness = delta
+        frame = [PopulationLog._DELTA.pack(generation, len(ids), genomes.shape[1], len(fitness)),
+                 np.ascontiguousarray(ids, dtype='<i8'), np.ascontiguousarray(genomes, dtype='<f8'),
+                 np.ascontiguousarray(fitness, dtype='<f8')]
+        digest = hashlib.sha256()
+        with open(os.path.join(path, name), 'ab') as file:
+            for part in frame:
+                digest.update(part)
+                file.write(part)
+            file.write(digest.digest())
+            file.flush()
+            os.fsync(file.fileno())
+        return 0
+
+    @staticmethod
+    def _read_delta(file: BinaryIO) -> dict | None:
+        """
+        Reads the next delta of a log
+        :param file: log file placed at the start of a delta
+        :return: generation, ids, genomes and fitness entries, None at the end of the log or at a torn delta
+        """
+        header = file.read(PopulationLog._DELTA.size)
+        if len(header) < PopulationLog._DELTA.size:
+            return None
+        generation, count, length, individuals = PopulationLog._DELTA.unpack(header)
+        sizes = (count * 8, count * length * 8, individuals * 8)
+        if os.fstat(file.fileno()).st_size - file.tell() < sum(sizes) + PopulationLog._DIGEST_SIZE:
+            return None
+        parts = [file.read(size) for size in sizes]
+        digest = hashlib.sha256(header)
+        for part in parts:
+            digest.update(part)
+        if digest.digest() != file.read(PopulationLog._DIGEST_SIZE):
+            return None
+        return {'generation': generation, 'ids': np.frombuffer(parts[0], dtype='<i8'),
+                'genomes': np.frombuffer(parts[1], dtype='<f8').reshape(count, length),
+                'fitness': np.frombuffer(parts[2], dtype='<f8')}
+
+    @staticmethod
+    def history(file_path: str) -> Iterator[dict]:
+        """
+        Reads the deltas of the log of a population file, the generations since its last snapshot
+        :param file_path: absolute path of the population file
+        :return: generation, ids, genomes and fitness of each delta, see PopulationLog.append
+        """
+        header = IO.load_population_header(file_path)
+        log_path = PopulationLog.log_name(os.path.normpath(file_path))
+        if not isinstance(header, dict) or not os.path.isfile(log_path):
+            return
+        with open(log_path, 'rb') as file:
+            prefix = file.read(PopulationLog._HEADER.size)
+            if len(prefix) < PopulationLog._HEADER.size:
+                return
+            magic, version, _, digest = PopulationLog._HEADER.unpack(prefix)
+            # The log of another snapshot, e.g. the compaction was interrupted after the snapshot was replaced
+            if magic != PopulationLog.MAGIC or version != PopulationLog.VERSION or digest.hex() != header['digest']:
+                return
+            while (delta := PopulationLog._read_delta(file)) is not None:
+                yield delta
+
+    @staticmethod
+    def load(file_path: str, mapped: bool = True) -> dict | int:
+        """
+        Loads a population applying its log to the snapshot, see IO.load_population. A mapped snapshot is mapped
+        copy-on-write, so just the rows replayed from the log are copied in memory
+        :param file_path: absolute path of the population file
+        :param mapped: False reads the snapshot into memory, see IO.load_population
+        :return: population or error code as in IO.load_population
+        """
+        replay = os.path.isfile(PopulationLog.log_name(os.path.normpath(file_path)))
+        population = IO.load_population(file_path, writable=replay, mapped=mapped)
+        if not replay or not isinstance(population, dict):
+            return population
+        genomes = population['population']
+        for delta in PopulationLog.history(file_path):
+            for id, genome in zip(delta['ids'].tolist(), delta['genomes']):
+                genomes[id][:] = genome
+        return population
@@ -5,38 +5,91 @@
 # Date: 06/09/2023
 # Version: 0.0.1
 
+from snake_ai.data import StatsTable
+import numpy as np
+
 
 class Stats:
     """
     Generates the plotting data from populations metrics
     """
-    def __init__(self, max_score):
+    def __init__(self, max_score, window: int = 0):
         """
         Constructor
         :param max_score: max possible score
+        :param window: number of last evaluations kept for the rolling window stats
         """
         self._limit_score = max_score
+        # Ring buffers with the stats and fitness of the last evaluations
+        self._window_stats = np.zeros(window, dtype=StatsTable.dtype)
+        self._window_fitness = np.zeros(window)
+        self._window_next = 0
+        self._window_size = 0
+
+    def add(self, population_stats: np.ndarray, fitness: np.ndarray) -> None:
+        """
+        Adds evaluations to the rolling window, the oldest ones are discarded once the window is full
+        :param population_stats: stats of the evaluations as a structured array, see StatsTable
+        :param fitness: fitness of the evaluations
+        :return:
+        """
+        window = len(self._window_fitness)
+        positions = (self._window_next + np.arange(len(population_stats))) % window
+        self._window_stats[positions] = population_stats
+        self._window_fitness[positions] = fitness
+        self._window_next = (self._window_next + len(population_stats)) % window
+        self._window_size = min(window, self._window_size + len(population_stats))
+
+    def window_stats(self, parameters: dict | None = None) -> dict:
+        """
+        Generates the data to be plotted over the evaluations of the rolling window
+        :param parameters: current values of the parameters adapted by the optimizer
+        :return:
+        """
+        return self.generation_stats(self._window_stats[:self._window_size], self._window_fitness[:self._window_size],
+                                     parameters)
+
+    def islands_stats(self, population_stats: list[np.ndarray], fitness: list[np.ndarray],
+                      parameters: list[dict] | None = None) -> dict:
+        """
+        Generates the data to be plotted over the last generation of an island model, the stats of the whole
+        population plus the stats of each island under the 'islands' key
+        :param population_stats: last population stats of each island
+        :param fitness: last population fitness of each island
+        :param parameters: current values of the parameters adapted by the optimizer of each island, the whole
+        population gets their average
+        :return:
+        """
+        parameters = [{}] * len(population_stats) if parameters is None else parameters
+        average = {name: float(np.mean([island[name] for island in parameters if name in island]))
+                   for name in set().union(*parameters)}
+        stats = self.generation_stats(np.concatenate(population_stats), np.concatenate(fitness), average)
+        stats['islands'] = [self.generation_stats(island_stats, island_fitness, island_parameters)
+                            for island_stats, island_fitness, island_parameters
+                            in zip(population_stats, fitness, parameters)]
+        return stats
 
-    def generation_stats(self, population_stats: list[tuple[int, dict[str, float]]], fitness: dict[int, float]) -> dict:
+    def generation_stats(self, population_stats: np.ndarray, fitness: np.ndarray,
+                         parameters: dict | None = None) -> dict:
         """
         Generates the data to be plotted over the last generation
-        :param population_stats: last population stats
+        :param population_stats: last population stats as a structured array, see StatsTable
         :param fitness: last population fitness
+        :param parameters: current values of the parameters adapted by the optimizer, e.g. the mutation rate and
+        sigma, they are passed under the 'parameters' key
         :return:
         """
-        scores = []
-        moves = []
-        efficiencies = []
-        for i in population_stats:
-            moves.append(i[1]['moves'])
-            scores.append(i[1]['score'])
-            efficiencies.append(i[1]['efficiency'])
+        scores = population_stats['score']
         # Calculate averages
-        fitness_avg = sum(list(fitness.values())) / len(fitness)
-        score_avg = sum(scores) / len(scores)
-        score_max = max(scores)
-        total_max_sc = scores.count(self._limit_score)
-        moves_avg = sum(moves) / len(moves)
-        efficiencies_avg = sum(efficiencies) / len(efficiencies)
+        fitness_avg = float(np.mean(fitness))
+        score_avg = float(np.mean(scores))
+        # The scores are averages when the individuals play several episodes
+        score_max = float(np.max(scores))
+        score_max = int(score_max) if score_max.is_integer() else score_max
+        total_max_sc = int(np.count_nonzero(scores == self._limit_score))
+        moves_avg = float(np.mean(population_stats['moves']))
+        efficiencies_avg = float(np.mean(population_stats['efficiency']))
+        scores = scores.tolist()
         return {'fitness_avg': fitness_avg, 'score_avg': score_avg, 'scores': scores, 'moves_avg': moves_avg,
-                'efficiencies_avg': efficiencies_avg, 'score_max': score_max, 'total_max_sc': total_max_sc}
+                'efficiencies_avg': efficiencies_avg, 'score_max': score_max, 'total_max_sc': total_max_sc,
+                'parameters': dict(parameters or {})}
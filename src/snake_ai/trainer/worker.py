@@ -7,10 +7,18 @@
 from snake_ai.snake.game_process.snake_batch_process import SnakeBatch
 from multiprocessing import Queue, Event, Process, Value, Array
 from snake_ai.genetic.genetic_algorithm import GA
+from snake_ai.genetic.evolution_strategy import SepCMAES, OpenAIES
+from snake_ai.genetic.optimizer_abc import Optimizer
+from snake_ai.genetic.island_model import IslandModel
 from snake_ai.gui._data import GeneticConfig
 from snake_ai.data import Folders
 from snake_ai.trainer.stats import Stats
+from snake_ai.trainer.checkpoint import CheckpointWriter
+from snake_ai.trainer.population_log import PopulationLog
 from snake_ai.IO import IO
+from queue import Empty
+import numpy as np
+import time
 
 
 class Worker:
@@ -21,13 +29,18 @@ class Worker:
         :param loop_flag: flag to control if the process still alive
         :param data_queue: queue where to put the produced data to be consumed for the mainloop
         :param termination_queue: queue to notify that the process has finished
-        :param sync: event used for synchronization with the mainloop
+        :param sync: event used for synchronization with the mainloop, None to pass every generation stats without
+        waiting for the mainloop to consume them
         :param worker_state: flag to know the current worker status and help with synchronization
         """
         self._batch: SnakeBatch | None = None
-        self._ga: GA | None = None
+        self._ga: Optimizer | None = None
+        self._islands: IslandModel | None = None
         self._stats_producer: Stats | None = None
+        self._checkpoints: CheckpointWriter | None = None
+        self._population_log: PopulationLog | None = None
         self._model_name: str | None = None
+        self._asynchronous = False
         self._ga_map = GeneticConfig()
         self._loop_flag = loop_flag
         self._data_queue = data_queue
@@ -36,8 +49,12 @@ class Worker:
         self._worker_state = worker_state
 
     @property
-    def batch(self):
-        return self._batch
+    def batch(self) -> SnakeBatch | IslandModel:
+        """
+        Holder of the population being trained, the island model when the training uses islands
+        :return:
+        """
+        return self._batch if self._islands is None else self._islands
 
     def init(self, config: dict, prev_population: dict | None = None) -> None:
         """
@@ -47,100 +64,375 @@ class Worker:
         :return: 
         """
         self._model_name = config['model']
-        # Create stats generator object
-        self._stats_producer = Stats(config['game_size'][0] * config['game_size'][1] - 3)
-        # Create population
-        self._batch = SnakeBatch(individuals=config['population'],
-                                 cpu_cores=config['cpu'],
-                                 size=config['game_size'],
-                                 input=22,
-                                 output=3,
-                                 hidden=config['hidden'],
-                                 vision=config['vision'],
-                                 bias=config['bias'],
-                                 bias_init=config['bias_init'],
-                                 output_init=config['output_init'],
-                                 hidden_init=config['hidden_init'],
-                                 output_act=config['output_act'],
-                                 hidden_act=config['hidden_act'])
+        self._asynchronous = config.get('asynchronous', False)
+        if self._asynchronous and config.get('optimizer', 'ga') != 'ga':
+            raise ValueError(f"Asynchronous training just supports the 'ga' optimizer. "
+                             f"Found: {config.get('optimizer')}")
+        # Create stats generator object, asynchronous training reports the last population size evaluations
+        self._stats_producer = Stats(config['game_size'][0] * config['game_size'][1] - 3, window=config['population'])
+        self._checkpoints = CheckpointWriter(every=config.get('checkpoint_every', 1),
+                                             interval=config.get('checkpoint_interval', 0.0))
+        offspring = config['population'] if config['replacement'] == 'generational' else config['offspring']
+        islands = config.get('islands', 1)
+        if islands > 1:
+            # Every island gets a part of the population, of the offspring and of the cpu cores
+            parts = []
+            for island, individuals in enumerate(np.array_split(np.arange(config['population']), islands)):
+                seed = IslandModel.island_seed(config.get('seed'), island)
+                parts.append((self._create_batch(config, len(individuals), max(1, config['cpu'] // islands), seed),
+                              self._create_optimizer(config, max(1, round(offspring * len(individuals) /
+                                                                          config['population'])), seed)))
+            self._islands = IslandModel(islands=parts, migrants=config.get('migrants', 1),
+                                        interval=config.get('migration_interval', 5))
+            self._population_log = None
+        else:
+            self._islands = None
+            self._batch = self._create_batch(config, config['population'], config['cpu'], config.get('seed'))
+            self._ga = self._create_optimizer(config, offspring, config.get('seed'))
+            # The GA replaces a few individuals per generation, so the population checkpoints can be logged as the
+            # individuals that changed, the evolution strategies resample the whole population
+            self._population_log = (PopulationLog(config['population'])
+                                    if config.get('checkpoint_deltas', False) and isinstance(self._ga, GA) else None)
         if prev_population is not None:
             pop = {}
             limit = (len(prev_population) if len(prev_population) <= config['population'] else
                      config['population'])
             for i in range(1, limit + 1):
                 pop[i] = prev_population[i]
-            self._batch.update_brains(pop)
-        # Create GA instance
-        self._ga = GA(selection=config['selection'],
-                      selection_params={self._ga_map.params_name[config['selection']]:
-                                        config['selection_param'][0]}
-                      if config['selection_param'][1] == 'normal' else {},
-                      fitness='fitness1',
-                      crossover=config['crossover'],
-                      crossover_params={self._ga_map.params_name[config['crossover']]:
-                                        config['crossover_param'][0]}
-                      if config['crossover_param'][1] == 'normal' else {},
-                      crossover_rate=config['crossover_rate'],
-                      mutation=config['mutation'],
-                      mutations_params={self._ga_map.params_name[config['mutation']]:
-                                        config['mutation_param'][0]}
-                      if config['mutation_param'][1] == 'normal' else {},
-                      mutation_rate=config['mutation_rate'],
-                      offspring=config['population'] if config['replacement'] == 'generational'
-                      else config['offspring']
-                      )
+            self.batch.update_brains(pop)
 
     @staticmethod
-    def _work(model_name: str, batch: SnakeBatch, ga: GA, alive: Value, data_queue: Queue, termination_queue: Queue,
-              event: Event, stats_producer: Stats, state: Array) -> None:
+    def _create_batch(config: dict, individuals: int, cpu_cores: int, seed: int | None) -> SnakeBatch:
+        """
+        Creates the batch of individuals to be trained
+        :param config: initialization configuration
+        :param individuals: number of individuals in the batch
+        :param cpu_cores: number of processes used by the batch
+        :param seed: seed of the batch
+        :return:
+        """
+        return SnakeBatch(individuals=individuals,
+                          cpu_cores=cpu_cores,
+                          size=config['game_size'],
+                          input=22,
+                          output=3,
+                          hidden=config['hidden'],
+                          vision=config['vision'],
+                          bias=config['bias'],
+                          bias_init=config['bias_init'],
+                          output_init=config['output_init'],
+                          hidden_init=config['hidden_init'],
+                          output_act=config['output_act'],
+                          hidden_act=config['hidden_act'],
+                          engine=config.get('engine', 'pool'),
+                          cmp_mode=config.get('cmp_mode', 'lazy'),
+                          seed=seed,
+                          reevaluate=config.get('reevaluate', False),
+                          episodes=config.get('episodes', 1),
+                          halving=config.get('halving', 2))
+
+    def _create_optimizer(self, config: dict, offspring: int, seed: int | None) -> Optimizer:
+        """
+        Creates the optimizer of the population, the genetic algorithm unless the configuration selects an evolution
+        strategy
+        :param config: initialization configuration
+        :param offspring: number of children per generation of the genetic algorithm
+        :param seed: seed of the optimizer
+        :return:
+        """
+        optimizer = config.get('optimizer', 'ga')
+        if optimizer == 'sep_cmaes':
+            return SepCMAES(fitness='fitness1', sigma=config.get('es_sigma'), seed=seed)
+        if optimizer == 'openai_es':
+            return OpenAIES(fitness='fitness1', learning_rate=config.get('es_learning_rate', 0.01),
+                            sigma=config.get('es_sigma'), seed=seed)
+        if optimizer != 'ga':
+            raise ValueError(f"Optimizer {optimizer} not supported. Supported optimizers "
+                             f"{['ga', 'sep_cmaes', 'openai_es']}")
+        return GA(selection=config['selection'],
+                  selection_params={self._ga_map.params_name[config['selection']]:
+                                    config['selection_param'][0]}
+                  if config['selection_param'][1] == 'normal' else {},
+                  fitness='fitness1',
+                  crossover=config['crossover'],
+                  crossover_params={self._ga_map.params_name[config['crossover']]:
+                                    config['crossover_param'][0]}
+                  if config['crossover_param'][1] == 'normal' else {},
+                  crossover_rate=config['crossover_rate'],
+                  mutation=config['mutation'],
+                  mutations_params={self._ga_map.params_name[config['mutation']]:
+                                    config['mutation_param'][0]}
+                  if config['mutation_param'][1] == 'normal' else {},
+                  mutation_rate=config['mutation_rate'],
+                  offspring=offspring,
+                  seed=seed,
+                  elitism=config.get('elitism', 0),
+                  schedule=config.get('schedule', 'constant'),
+                  schedule_params=config.get('schedule_params')
+                  )
+
+    @staticmethod
+    def _checkpoint(checkpoints: CheckpointWriter, model_name: str, generation: int, individual: dict,
+                    population: dict, force: bool = False, log: PopulationLog | None = None,
+                    fitness: np.ndarray | None = None) -> None:
+        """
+        Saves the current best individual and population in the background if a checkpoint is due
+        :param checkpoints: checkpoint writer of the training
+        :param model_name: name that is going to be used to save the model at disc
+        :param generation: generation number
+        :param individual: best individual as in SnakeBatch.get_individual
+        :param population: population as in SnakeBatch.population
+        :param force: saves even if the checkpoint is not due, e.g. when the training stops
+        :param log: population log, when given the population is saved as the individuals changed since the last
+        checkpoint
+        :param fitness: last fitness of each individual, needed with the log
+        :return:
+        """
+        if checkpoints.due(generation) or force:
+            checkpoints.submit(Folders.models_folder, model_name + '.nn', individual)
+            if log is None:
+                checkpoints.submit(Folders.populations_folder, model_name + '.pop', population,
+                                   save=IO.save_population)
+            else:
+                log.checkpoint(checkpoints, Folders.populations_folder, model_name + '.pop', generation, population,
+                               fitness)
+
+    @staticmethod
+    def _work(model_name: str, batch: SnakeBatch, ga: Optimizer, alive: Value, data_queue: Queue,
+              termination_queue: Queue, event: Event, stats_producer: Stats, state: Array,
+              checkpoints: CheckpointWriter, log: PopulationLog | None) -> None:
         """
         Runs a loop training the models while 'alive' flag is activated
         :param model_name: name that is going to be used to save the model at disc
         :param alive: flag to control if the process still alive
         :param data_queue: queue where to put the produced data to be consumed for the mainloop
         :param termination_queue: queue to notify that the process has finished
-        :param event: event used for synchronization with the mainloop
+        :param event: event used for synchronization with the mainloop, None to run without synchronization
+        :params stats_producer: stats producer object
+        :params state: flag to describe the worker state
+        :params checkpoints: writer of the best individual and population files
+        :params log: log of the population checkpoints, None to save the whole population every checkpoint
+        :return:
+        """
+        generation = 0
+        best = None
+        try:
+            while alive.value:
+                state.value = b'wr'
+                # Run the games
+                batch.run()
+                stats = batch.results
+                # Run genetic process, the children are written in the genome matrix the NN are bound to
+                best, fitness = ga.next_gen(population=batch.genomes.array, scores=stats)
+                generation += 1
+                if log is not None:
+                    log.change(ga.replaced)
+                # Save current best and las population
+                Worker._checkpoint(checkpoints, model_name, generation, batch.get_individual(best), batch.population,
+                                   log=log, fitness=fitness)
+                # Pass execution stats to main process
+                data_queue.put(stats_producer.generation_stats(stats, fitness, ga.parameters))
+                # Synchronize with the main process
+                if event is None:
+                    continue
+                state.value = b'wt'
+                if event.wait(120):
+                    event.clear()
+                else:
+                    break
+            else:
+                state.value = b'sv'
+                # The last generation is saved even if its checkpoint was not due
+                if best is not None:
+                    Worker._checkpoint(checkpoints, model_name, generation, batch.get_individual(best),
+                                       batch.population, force=True, log=log, fitness=fitness)
+                checkpoints.close()
+                # Send the current population status to the parent process, the files are complete by then
+                termination_queue.put(batch.get_population_brains())
+        finally:
+            checkpoints.close()
+            batch.close()
+
+    @staticmethod
+    def _work_async(model_name: str, batch: SnakeBatch, ga: GA, alive: Value, data_queue: Queue,
+                    termination_queue: Queue, event: Event, stats_producer: Stats, state: Array,
+                    checkpoints: CheckpointWriter, log: PopulationLog | None) -> None:
+        """
+        Runs an asynchronous steady state training while 'alive' flag is activated. The pool processes pull the
+        individuals to be evaluated, as soon as some evaluations come back the worst evaluated individuals are replaced
+        by children and dispatched, so the processes never wait for a generation to end. Every population size
+        evaluations the stats of the rolling window are passed to the main process, which does not stop the training
+        :param model_name: name that is going to be used to save the model at disc
+        :param alive: flag to control if the process still alive
+        :param data_queue: queue where to put the produced data to be consumed for the mainloop
+        :param termination_queue: queue to notify that the process has finished
+        :param event: event used for synchronization with the mainloop, None to run without synchronization
         :params stats_producer: stats producer object
         :params state: flag to describe the worker state
+        :params checkpoints: writer of the best individual and population files
+        :params log: log of the population checkpoints, None to save the whole population every checkpoint
         :return:
         """
-        while alive.value:
+        best = None
+        try:
+            individuals = batch.genomes.shape[0]
+            fitness = np.zeros(individuals)
+            evaluated = np.zeros(individuals, dtype=bool)
+            # Enough orders are queued for every process to find the next one as soon as it is idle, the children are
+            # produced in chunks of a few freed slots to keep the coordination cost low
+            in_flight = 2 * batch.cpu_cores + 2
+            chunk = max(2, batch.cpu_cores)
+            arrived = []
+            completed = 0
+            acknowledged = True
+            waiting = time.monotonic()
             state.value = b'wr'
-            # Run the games
-            population = batch.get_population_brains()
-            batch.run()
-            stats = batch.results
-            # Run genetic process
-            best, fitness = ga.next_gen(population=population, scores=stats)
-            batch.update_brains(population)
-            # Save current best and las population
-            try:
-                IO.save(Folders.models_folder, model_name + '.nn', batch.get_individual(best))
-                IO.save(Folders.populations_folder, model_name + '.pop', batch.population)
-            except:
-                pass
-            # Pass execution stats to main process
-            data_queue.put(stats_producer.generation_stats(stats, fitness))
-            # Synchronize with the main process
-            state.value = b'wt'
-            if event.wait(120):
-                event.clear()
+            batch.submit(list(range(1, individuals + 1)))
+            while alive.value:
+                arrived.append(batch.collect())
+                completed += 1
+                free = in_flight - batch.pending
+                end_window = completed % individuals == 0
+                if free < chunk and not end_window:
+                    continue
+                # Calculate the fitness of the evaluations that have arrived
+                stats = np.concatenate(arrived)
+                arrived.clear()
+                ids = stats['id']
+                fitness[ids - 1] = ga.fitness(stats)
+                evaluated[ids - 1] = True
+                stats_producer.add(stats, fitness[ids - 1])
+                # Run genetic process over the evaluated individuals, the children are written in the genome matrix
+                # the NN are bound to
+                if free >= chunk and evaluated.sum() > free:
+                    replaced = ga.steady_state(population=batch.genomes.array, population_fitness=fitness,
+                                               evaluated=np.flatnonzero(evaluated) + 1, offspring=free)
+                    evaluated[replaced - 1] = False
+                    batch.submit(replaced.tolist())
+                    if log is not None:
+                        log.change(replaced)
+                if not end_window:
+                    continue
+                # Save current best and las population
+                best = int(np.flatnonzero(evaluated)[np.argmax(fitness[evaluated])]) + 1
+                Worker._checkpoint(checkpoints, model_name, completed // individuals, batch.get_individual(best),
+                                   batch.population, log=log, fitness=fitness)
+                # Pass the window stats to main process if it has consumed the previous ones
+                if event is None:
+                    acknowledged = True
+                elif event.is_set():
+                    event.clear()
+                    acknowledged = True
+                if acknowledged:
+                    data_queue.put(stats_producer.window_stats(ga.parameters))
+                    acknowledged = False
+                    waiting = time.monotonic()
+                elif time.monotonic() - waiting > 120:
+                    break
             else:
-                break
-        else:
-            state.value = b'sv'
-            # Send the current population status to the parent process
-            termination_queue.put(batch.get_population_brains())
+                state.value = b'sv'
+                # The last window is saved even if its checkpoint was not due
+                if best is not None:
+                    Worker._checkpoint(checkpoints, model_name, completed // individuals, batch.get_individual(best),
+                                       batch.population, force=True, log=log, fitness=fitness)
+                checkpoints.close()
+                # Send the current population status to the parent process, the files are complete by then
+                termination_queue.put(batch.get_population_brains())
+        finally:
+            checkpoints.close()
+            batch.close()
 
-    def train(self):
+    @staticmethod
+    def _work_islands(model_name: str, islands: IslandModel, alive: Value, data_queue: Queue,
+                      termination_queue: Queue, event: Event, stats_producer: Stats, state: Array,
+                      checkpoints: CheckpointWriter) -> None:
         """
-        Wraps the _work method two executed as a new process
+        Runs an island model training while 'alive' flag is activated. The islands evolve in their own processes, once
+        all of them have reported a generation the best individual and the population are saved and the stats of the
+        whole population and of each island are passed to the main process, which does not stop the islands
+        :param model_name: name that is going to be used to save the model at disc
+        :param islands: island model to be trained
+        :param alive: flag to control if the process still alive
+        :param data_queue: queue where to put the produced data to be consumed for the mainloop
+        :param termination_queue: queue to notify that the process has finished
+        :param event: event used for synchronization with the mainloop, None to run without synchronization
+        :params stats_producer: stats producer object
+        :params state: flag to describe the worker state
+        :params checkpoints: writer of the best individual and population files
         :return:
         """
-        process = Process(target=Worker._work, args=(self._model_name, self._batch, self._ga, self._loop_flag,
-                                                     self._data_queue, self._done_queue, self._event,
-                                                     self._stats_producer, self._worker_state))
+        reports: dict[int, dict[int, tuple]] = {}
+        genomes: list[np.ndarray | None] = [None] * islands.islands
+        # Generation, best individual and population of the last complete generation
+        last: tuple[int, dict, dict] | None = None
+        acknowledged = True
+        waiting = time.monotonic()
+        try:
+            state.value = b'wr'
+            islands.start(alive)
+            while alive.value:
+                try:
+                    (island, generation, stats, fitness, individual, island_genomes,
+                     parameters) = islands.report(timeout=1)
+                except Empty:
+                    continue
+                genomes[island] = island_genomes
+                reports.setdefault(generation, {})[island] = (stats, fitness, individual, parameters)
+                if len(reports[generation]) < islands.islands:
+                    continue
+                generation_reports = [reports[generation][island] for island in range(islands.islands)]
+                del reports[generation]
+                # Save current best and las population
+                best = max(generation_reports, key=lambda report: report[1].max())[2]
+                population = islands.population
+                population['population'] = islands.get_population_brains(genomes)
+                last = (generation, best, population)
+                Worker._checkpoint(checkpoints, model_name, *last)
+                # Pass the generation stats to main process if it has consumed the previous ones
+                if event is None:
+                    acknowledged = True
+                elif event.is_set():
+                    event.clear()
+                    acknowledged = True
+                if acknowledged:
+                    data_queue.put(stats_producer.islands_stats([report[0] for report in generation_reports],
+                                                                [report[1] for report in generation_reports],
+                                                                [report[3] for report in generation_reports]))
+                    acknowledged = False
+                    waiting = time.monotonic()
+                elif time.monotonic() - waiting > 120:
+                    break
+            else:
+                state.value = b'sv'
+                # The last complete generation is saved even if its checkpoint was not due
+                if last is not None:
+                    Worker._checkpoint(checkpoints, model_name, *last, force=True)
+                checkpoints.close()
+                # Send the current population status to the parent process, the files are complete by then
+                termination_queue.put(islands.get_population_brains(genomes) if all(matrix is not None
+                                                                                    for matrix in genomes)
+                                      else islands.get_population_brains())
+        finally:
+            # The islands stop with the flag
+            alive.value = False
+            islands.close()
+            checkpoints.close()
+
+    def train(self) -> Process:
+        """
+        Wraps the _work method two executed as a new process
+        :return: process running the training
+        """
+        if self._islands is not None:
+            target, population, log = Worker._work_islands, (self._islands,), ()
+        else:
+            target = Worker._work_async if self._asynchronous else Worker._work
+            population, log = (self._batch, self._ga), (self._population_log,)
+        process = Process(target=target, args=(self._model_name, *population, self._loop_flag, self._data_queue,
+                                               self._done_queue, self._event, self._stats_producer,
+                                               self._worker_state, self._checkpoints, *log))
         process.start()
+        return process
 
 
 